@@ -0,0 +1,233 @@
+import asyncio
+import bisect
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+import httpx  # type: ignore[import-not-found]
+from fastapi import HTTPException, Request  # type: ignore[import-not-found]
+from fastapi.responses import RedirectResponse, Response, StreamingResponse  # type: ignore[import-not-found]
+
+from app.config import settings
+from app.domains import registrable_domain
+
+logger = logging.getLogger(__name__)
+
+# Set on forwarded requests; a node receiving one always handles it locally
+FORWARDED_HEADER = "X-Cluster-Forwarded-By"
+
+# Request headers worth passing to the owning node
+_FORWARD_REQUEST_HEADERS = {"authorization", "content-type", "accept", "x-request-id"}
+_HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "transfer-encoding", "upgrade", "content-length",
+}
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes
+
+    Adding or removing a node only moves the keys in its arcs, so most
+    domains keep their owner (and its warm cookies, caches and stats).
+    """
+
+    def __init__(self, nodes: List[str], virtual_nodes: int) -> None:
+        self.nodes = sorted(set(nodes))
+        points = sorted(
+            (_hash(f"{node}#{i}"), node)
+            for node in self.nodes
+            for i in range(virtual_nodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._hashes:
+            return None
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+    def shares(self) -> Dict[str, float]:
+        """Fraction of the hash space each node owns"""
+        space = 1 << 64
+        shares = {node: 0 for node in self.nodes}
+        for i, point in enumerate(self._hashes):
+            previous = self._hashes[i - 1] if i else self._hashes[-1] - space
+            shares[self._owners[i]] += point - previous
+        return {node: round(share / space, 4) for node, share in shares.items()}
+
+
+class Cluster:
+    """Static-peer cluster membership with health checks and domain routing"""
+
+    def __init__(self, self_url: str, peers: List[str], virtual_nodes: int) -> None:
+        self.self_url = self_url.rstrip("/")
+        self.peers = sorted({peer.rstrip("/") for peer in peers} | {self.self_url})
+        self.virtual_nodes = virtual_nodes
+        # Assume every peer is up until a health check says otherwise
+        self.healthy: Set[str] = set(self.peers)
+        self.ring = HashRing(list(self.healthy), virtual_nodes)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._health_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.CLUSTER_FORWARD_TIMEOUT, connect=5.0)
+        )
+        self._health_task = asyncio.create_task(self._check_health_periodically())
+        logger.info(
+            "Cluster mode enabled as %s with peers %s", self.self_url, self.peers
+        )
+
+    async def stop(self) -> None:
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    def _set_healthy(self, healthy: Set[str]) -> None:
+        healthy.add(self.self_url)
+        if healthy == self.healthy:
+            return
+        joined, left = healthy - self.healthy, self.healthy - healthy
+        self.healthy = healthy
+        self.ring = HashRing(list(healthy), self.virtual_nodes)
+        logger.warning(
+            "Cluster ring rebuilt: joined=%s left=%s nodes=%s",
+            sorted(joined),
+            sorted(left),
+            len(healthy),
+        )
+
+    async def _probe(self, peer: str) -> bool:
+        try:
+            response = await self._client.get(
+                f"{peer}/health", timeout=settings.CLUSTER_HEALTH_TIMEOUT
+            )
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    async def check_health(self) -> None:
+        others = [peer for peer in self.peers if peer != self.self_url]
+        results = await asyncio.gather(*(self._probe(peer) for peer in others))
+        self._set_healthy({peer for peer, ok in zip(others, results) if ok})
+
+    async def _check_health_periodically(self) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(settings.CLUSTER_HEALTH_INTERVAL)
+
+    def owner_for(self, url: str) -> Optional[str]:
+        host = urlsplit(url).hostname
+        if not host:
+            return None
+        return self.ring.owner(registrable_domain(host))
+
+    async def route(self, request: Request, url: str) -> Optional[Response]:
+        """Send the request to the node owning the URL's domain
+
+        Returns None when this node should handle it: it owns the domain, the
+        request was already forwarded once, or the owner refused the connection.
+        Once the owner may have started the job, failures are not retried
+        locally; they surface as 502, or 504 when the owner timed out.
+        """
+        if FORWARDED_HEADER in request.headers:
+            return None
+        owner = self.owner_for(url)
+        if owner is None or owner == self.self_url:
+            return None
+
+        target = f"{owner}{request.url.path}"
+        if request.url.query:
+            target += f"?{request.url.query}"
+
+        if settings.CLUSTER_ROUTING == "redirect":
+            # 307 keeps the method and body on the client's retry
+            return RedirectResponse(target, status_code=307)
+
+        headers = {
+            name: value
+            for name, value in request.headers.items()
+            if name.lower() in _FORWARD_REQUEST_HEADERS
+        }
+        headers[FORWARDED_HEADER] = self.self_url
+        # Let this node's middleware negotiate compression with the client
+        headers["Accept-Encoding"] = "identity"
+
+        try:
+            upstream = await self._client.send(
+                self._client.build_request(
+                    "POST", target, content=await request.body(), headers=headers
+                ),
+                stream=True,
+            )
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            # Nothing reached the owner, so running the job here can't duplicate it
+            logger.warning("Forwarding to %s failed, handling locally: %s", owner, e)
+            self._set_healthy(self.healthy - {owner})
+            return None
+        except httpx.TimeoutException as e:
+            logger.warning("Forwarding to %s timed out: %s", owner, e)
+            raise HTTPException(status_code=504, detail=f"Cluster node {owner} timed out")
+        except httpx.HTTPError as e:
+            logger.warning("Forwarding to %s failed: %s", owner, e)
+            raise HTTPException(status_code=502, detail=f"Cluster node {owner} failed: {e}")
+
+        logger.info("Forwarded %s for %s to %s", request.url.path, url, owner)
+        response_headers = {
+            name: value
+            for name, value in upstream.headers.items()
+            if name.lower() not in _HOP_BY_HOP_HEADERS
+        }
+        response_headers["X-Cluster-Node"] = owner
+
+        async def body():
+            try:
+                async for chunk in upstream.aiter_raw():
+                    yield chunk
+            finally:
+                await upstream.aclose()
+
+        return StreamingResponse(
+            body(), status_code=upstream.status_code, headers=response_headers
+        )
+
+    def status(self, domain: Optional[str] = None) -> Dict[str, Any]:
+        status: Dict[str, Any] = {
+            "self": self.self_url,
+            "routing": settings.CLUSTER_ROUTING,
+            "peers": [
+                {"url": peer, "healthy": peer in self.healthy} for peer in self.peers
+            ],
+            "virtual_nodes": self.virtual_nodes,
+            "ring_shares": self.ring.shares(),
+        }
+        if domain:
+            key = registrable_domain(domain)
+            status["lookup"] = {"domain": key, "owner": self.ring.owner(key)}
+        return status
+
+
+def _build_cluster() -> Optional[Cluster]:
+    if not settings.CLUSTER_ENABLED:
+        return None
+    if not settings.CLUSTER_SELF:
+        raise ValueError("CLUSTER_SELF must be set when CLUSTER_ENABLED is true")
+    return Cluster(
+        settings.CLUSTER_SELF, settings.CLUSTER_PEERS, settings.CLUSTER_VIRTUAL_NODES
+    )
+
+
+cluster = _build_cluster()
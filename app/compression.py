@@ -0,0 +1,179 @@
+import zlib
+from typing import Callable, Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders  # type: ignore[import-not-found]
+from starlette.types import ASGIApp, Message, Receive, Scope, Send  # type: ignore[import-not-found]
+
+try:
+    import brotli  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+class _Compressor:
+    """Uniform streaming interface over gzip, brotli and zstd
+
+    `flush` emits everything compressed so far as a complete block the client
+    can decode, without ending the stream; `finish` ends it.
+    """
+
+    def __init__(
+        self,
+        compress: Callable[[bytes], bytes],
+        flush: Callable[[], bytes],
+        finish: Callable[[], bytes],
+    ):
+        self.compress = compress
+        self.flush = flush
+        self.finish = finish
+
+
+def _gzip() -> _Compressor:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    return _Compressor(
+        compressor.compress,
+        lambda: compressor.flush(zlib.Z_SYNC_FLUSH),
+        compressor.flush,
+    )
+
+
+def _brotli() -> _Compressor:
+    compressor = brotli.Compressor(quality=4)
+    return _Compressor(compressor.process, compressor.flush, compressor.finish)
+
+
+def _zstd() -> _Compressor:
+    compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    return _Compressor(
+        compressor.compress,
+        lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+        compressor.flush,
+    )
+
+
+# Server preference order; only codecs whose library is importable are offered
+ENCODERS: Dict[str, Callable[[], _Compressor]] = {}
+if zstandard is not None:
+    ENCODERS["zstd"] = _zstd
+if brotli is not None:
+    ENCODERS["br"] = _brotli
+ENCODERS["gzip"] = _gzip
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson")
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the preferred available coding the client accepts (q > 0)"""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+
+    wildcard = accepted.get("*", 0.0)
+    candidates: List[str] = [
+        coding for coding in ENCODERS if accepted.get(coding, wildcard) > 0
+    ]
+    if not candidates:
+        return None
+    # Highest q wins; ties go to the server preference order
+    return max(candidates, key=lambda coding: accepted.get(coding, wildcard))
+
+
+class CompressionMiddleware:
+    """Compress responses with zstd, brotli or gzip based on Accept-Encoding
+
+    Works on streamed bodies too, so `format=raw` and `/crawl` responses are
+    compressed and flushed chunk by chunk without buffering the whole body.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send: Send, encoding: str, minimum_size: int) -> None:
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            if "content-encoding" in headers or not content_type.startswith(
+                COMPRESSIBLE_TYPES
+            ):
+                self.passthrough = True
+                await self._send(message)
+            else:
+                # Hold the start message until we know the body size
+                self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            self.compressor = ENCODERS[self.encoding]()
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            if not more_body:
+                compressed = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            await self._send(self.start_message)
+
+        # Flush each chunk so streamed responses (/crawl NDJSON, raw HTML) reach
+        # the client as they are produced instead of at the end of the stream
+        chunk = self.compressor.compress(body)
+        chunk += self.compressor.flush() if more_body else self.compressor.finish()
+        await self._send(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
@@ -1,4 +1,5 @@
 import os
+from typing import Dict, List, Literal
 from pydantic import field_validator  # type: ignore[import-not-found]
 from pydantic_settings import BaseSettings  # type: ignore[import-not-found]
 
@@ -13,6 +14,97 @@ class Settings(BaseSettings):
     DEFAULT_TIMEOUT: int = 30000
     MAX_RETRIES: int = 3
 
+    # Adaptive timeouts learned per domain when the client does not pin one
+    ADAPTIVE_TIMEOUTS_ENABLED: bool = True
+    ADAPTIVE_TIMEOUT_QUANTILE: float = 0.95
+    ADAPTIVE_TIMEOUT_MARGIN: float = 1.5
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES: int = 10
+    ADAPTIVE_TIMEOUT_MIN_MS: int = 5000
+    ADAPTIVE_TIMEOUT_MAX_MS: int = 120000
+    ADAPTIVE_TIMEOUT_MAX_TIMEOUT_RATE: float = 0.25
+    ADAPTIVE_TIMEOUT_STATE_FILE: str = ".cache/latency_stats.json"
+    ADAPTIVE_TIMEOUT_FLUSH_INTERVAL: int = 60
+
+    # Camoufox launch profile caches
+    CAMOUFOX_GEOIP_CACHE_TTL: int = 3600
+    CAMOUFOX_GEOIP_FAILURE_TTL: int = 60
+    CAMOUFOX_FINGERPRINT_POOL_SIZE: int = 8
+    CAMOUFOX_PIN_FINGERPRINTS: bool = True
+    CAMOUFOX_FINGERPRINT_PIN_TTL: int = 86400
+    CAMOUFOX_FINGERPRINT_PIN_MAX: int = 10000
+
+    # HTTP fast path
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_PROXY_CLIENTS: int = 32
+    TIER_MEMORY_TTL: int = 3600
+    TIER_MEMORY_MAX_DOMAINS: int = 10000
+
+    # Upper bound on simulated human interaction per page (ms)
+    HUMAN_BEHAVIOR_BUDGET_MS: int = 5000
+
+    # Shared subresource cache and request blocking
+    RESOURCE_CACHE_ENABLED: bool = True
+    RESOURCE_CACHE_DIR: str = ".cache/resources"
+    RESOURCE_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    RESOURCE_BLOCKLIST: List[str] = [
+        "doubleclick.net",
+        "googlesyndication.com",
+        "googleadservices.com",
+        "google-analytics.com",
+        "adservice.google.com",
+        "facebook.net",
+        "connect.facebook.net",
+        "hotjar.com",
+        "segment.io",
+        "mixpanel.com",
+        "amplitude.com",
+        "scorecardresearch.com",
+        "quantserve.com",
+        "adnxs.com",
+        "criteo.com",
+        "taboola.com",
+        "outbrain.com",
+        "newrelic.com",
+        "nr-data.net",
+    ]
+    # Camoufox aborts these resource types outright
+    BLOCKED_RESOURCE_TYPES: List[str] = ["image", "media", "font", "stylesheet"]
+
+    # crawl jobs
+    CRAWL_DIR: str = ".cache/crawl"
+    CRAWL_BLOOM_CAPACITY: int = 1_000_000
+    CRAWL_BLOOM_ERROR_RATE: float = 0.001
+    CRAWL_PER_DOMAIN_CONCURRENCY: int = 2
+
+    # Normalized content kept for change-detection diffs
+    FINGERPRINT_HISTORY_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # Responses smaller than this are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+
+    # event loop diagnostics
+    LOOP_LAG_INTERVAL_MS: int = 100
+    SLOW_CALLBACK_THRESHOLD_MS: int = 250
+    PROFILE_MAX_DURATION_S: int = 30
+    # /debug/profile exposes stacks and task state; off unless explicitly enabled
+    DEBUG_ENDPOINTS_ENABLED: bool = False
+
+    # cluster mode: shard domains across replicas by consistent hashing
+    CLUSTER_ENABLED: bool = False
+    CLUSTER_SELF: str = ""
+    CLUSTER_PEERS: List[str] = []
+    CLUSTER_VIRTUAL_NODES: int = 128
+    CLUSTER_ROUTING: Literal["forward", "redirect"] = "forward"
+    CLUSTER_HEALTH_INTERVAL: float = 5.0
+    CLUSTER_HEALTH_TIMEOUT: float = 2.0
+    CLUSTER_FORWARD_TIMEOUT: float = 600.0
+
+    # logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: Literal["json", "text"] = "json"
+    # Fraction of records kept per level, e.g. {"INFO": 0.1}
+    LOG_SAMPLE_RATES: Dict[str, float] = {}
+
     # auth
     API_KEY: str = ""
     ENABLE_AUTH: bool = os.getenv("ENABLE_AUTH", "false").lower() == "true"
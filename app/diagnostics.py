@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import statistics
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_filename}:{code.co_name}:{frame.f_lineno}"
+
+
+class LoopLagMonitor:
+    """Measure event-loop lag and capture the loop's stack when it stalls
+
+    A coroutine sleeps for a fixed interval and records how late it wakes up.
+    A watchdog thread watches the coroutine's heartbeat; when it goes stale
+    for longer than the slow-callback threshold, whatever is blocking the loop
+    is still on the stack, so the thread captures it.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        slow_threshold: float,
+        history: int = 600,
+        max_stalls: int = 20,
+    ) -> None:
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.lags: Deque[float] = deque(maxlen=history)
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=max_stalls)
+        self.stall_count = 0
+        self.loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        self.loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._sample(), name="loop-lag-monitor")
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-lag-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sample(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.lags.append(max(0.0, now - expected))
+            self._heartbeat = now
+
+    def _watch(self) -> None:
+        captured_for: Optional[float] = None
+        while not self._stop.wait(self.slow_threshold / 2):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            if blocked_for < self.slow_threshold or captured_for == heartbeat:
+                continue
+
+            # Capture once per stall; the heartbeat moves on when the loop recovers
+            captured_for = heartbeat
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.format_stack(frame)
+            self.stall_count += 1
+            self.stalls.append(
+                {
+                    "timestamp": time.time(),
+                    "blocked_ms": round(blocked_for * 1000, 1),
+                    "stack": stack,
+                }
+            )
+            logger.warning(
+                "Event loop blocked for at least %.0fms in %s",
+                blocked_for * 1000,
+                _frame_label(frame),
+                extra={"stack": "".join(stack[-10:])},
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        lags_ms = sorted(lag * 1000 for lag in self.lags)
+        if not lags_ms:
+            return {"samples": 0, "stall_count": self.stall_count}
+        return {
+            "samples": len(lags_ms),
+            "mean_ms": round(statistics.fmean(lags_ms), 2),
+            "p50_ms": round(lags_ms[len(lags_ms) // 2], 2),
+            "p99_ms": round(lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))], 2),
+            "max_ms": round(lags_ms[-1], 2),
+            "stall_count": self.stall_count,
+            "recent_stalls": list(self.stalls),
+        }
+
+
+def _sample_stacks(
+    thread_id: int, duration: float, interval: float, max_depth: int
+) -> Counter:
+    samples: Counter = Counter()
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        stack: List[str] = []
+        while frame is not None and len(stack) < max_depth:
+            stack.append(_frame_label(frame))
+            frame = frame.f_back
+        if stack:
+            samples[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+    return samples
+
+
+async def sample_profile(
+    thread_id: int, duration: float, interval: float, top: int = 50
+) -> Dict[str, Any]:
+    """Sample the loop thread's stack from a worker thread for `duration` seconds
+
+    Returns collapsed stacks (root;...;leaf) with sample counts, the format
+    flame-graph tools consume.
+    """
+    samples = await asyncio.to_thread(_sample_stacks, thread_id, duration, interval, 64)
+    total = sum(samples.values())
+    return {
+        "duration_s": duration,
+        "interval_ms": interval * 1000,
+        "total_samples": total,
+        "stacks": [
+            {"stack": stack, "samples": count}
+            for stack, count in samples.most_common(top)
+        ],
+    }
+
+
+def dump_tasks(stack_limit: int = 10) -> List[Dict[str, Any]]:
+    """List every asyncio task with the await points it is suspended at"""
+    tasks = []
+    for task in asyncio.all_tasks():
+        frames = task.get_stack(limit=stack_limit)
+        coro = task.get_coro()
+        tasks.append(
+            {
+                "name": task.get_name(),
+                "coroutine": getattr(coro, "__qualname__", repr(coro)),
+                "done": task.done(),
+                "await_points": [_frame_label(frame) for frame in frames],
+            }
+        )
+    return tasks
+
+
+loop_monitor = LoopLagMonitor(
+    interval=settings.LOOP_LAG_INTERVAL_MS / 1000,
+    slow_threshold=settings.SLOW_CALLBACK_THRESHOLD_MS / 1000,
+)
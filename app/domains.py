@@ -0,0 +1,22 @@
+import ipaddress
+
+# Second-level labels under which registrations happen one level deeper
+_SECOND_LEVEL_LABELS = {"ac", "co", "com", "edu", "gov", "ltd", "net", "org", "plc", "ne", "or", "go"}
+
+
+def registrable_domain(host: str) -> str:
+    """Approximate the registrable domain (eTLD+1) without a public suffix list
+
+    Uses the last two labels, or three when the second-to-last is a common
+    second-level label under a two-letter ccTLD (example.co.uk, shop.com.au).
+    """
+    host = host.lower().rstrip(".")
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+    labels = host.split(".")
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL_LABELS:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
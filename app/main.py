@@ -1,13 +1,33 @@
-from fastapi import Depends, FastAPI, HTTPException  # type: ignore[import-not-found]
+from fastapi import Depends, FastAPI, HTTPException, Query, Request  # type: ignore[import-not-found]
+from fastapi.responses import StreamingResponse  # type: ignore[import-not-found]
 from contextlib import asynccontextmanager
 import logging
+import re
+import threading
+import uuid
+from typing import Literal, Optional
 from app.auth import verify_api_key
-from app.models import ScrapeRequest, ScrapeResponse, HealthResponse
+from app.cluster import cluster
+from app.compression import CompressionMiddleware
+from app.diagnostics import dump_tasks, loop_monitor, sample_profile
+from app.logging_config import request_id_var, setup_logging
+from app.responses import model_json_response, raw_html_response
+from app.models import (
+    CrawlRequest,
+    HealthResponse,
+    ScrapeRequest,
+    ScrapeResponse,
+    ScraperType,
+)
+from app.services.browser_profiles import fingerprint_pool
+from app.services.crawler import Crawler
 from app.services.factory import ScraperFactory
+from app.services.fingerprint import apply_change_detection, validate_selector
+from app.services.timeouts import latency_tracker
 from app.config import settings
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+log_listener = setup_logging()
 logger = logging.getLogger(__name__)
 
 
@@ -15,11 +35,18 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting scraper service...")
+    loop_monitor.start()
     await ScraperFactory.initialize()
+    if cluster:
+        await cluster.start()
     yield
     # Shutdown
     logger.info("Shutting down scraper service...")
+    if cluster:
+        await cluster.stop()
     await ScraperFactory.cleanup()
+    await loop_monitor.stop()
+    log_listener.stop()
 
 
 app = FastAPI(
@@ -29,6 +56,21 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    """Tag every log record emitted while handling a request with its id"""
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
@@ -40,15 +82,49 @@ async def health_check():
 
 
 @app.post("/scrape", response_model=ScrapeResponse)
-async def scrape_url(request: ScrapeRequest, api_key: str = Depends(verify_api_key)):
+async def scrape_url(
+    request: ScrapeRequest,
+    http_request: Request,
+    format: Literal["json", "raw"] = Query(
+        "json", description="`raw` streams the HTML with metadata in X-Scrape-* headers"
+    ),
+    api_key: str = Depends(verify_api_key),
+):
     """Scrape a URL using specified scraper service"""
+    if request.fingerprint_selector is not None:
+        # Reject a bad selector before paying for a browser scrape
+        try:
+            validate_selector(request.fingerprint_selector)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    if request.capture and request.scraper_type == ScraperType.HTTP:
+        # A plain HTTP fetch runs no page, so there are no responses to capture
+        raise HTTPException(
+            status_code=400, detail="capture requires a browser or auto scraper_type"
+        )
+
+    if cluster:
+        routed = await cluster.route(http_request, str(request.url))
+        if routed:
+            return routed
+
     try:
-        scraper = ScraperFactory.get_scraper(request.scraper_type)
+        tiers = None
+        if request.fast_path and request.scraper_type not in (
+            ScraperType.HTTP,
+            ScraperType.AUTO,
+        ):
+            # Try plain HTTP first, escalate to the requested browser tier
+            tiers = [ScraperType.HTTP, request.scraper_type]
+            scraper = ScraperFactory.get_scraper(ScraperType.AUTO)
+        else:
+            scraper = ScraperFactory.get_scraper(request.scraper_type)
 
         result = await scraper.scrape(
             url=str(request.url),
             selector_to_wait_for=request.selector_to_wait_for,
-            timeout=request.timeout or settings.DEFAULT_TIMEOUT,
+            timeout=request.timeout,
             headless=request.headless,
             proxy_url=request.proxy_url if request.proxy_url else None,
             proxy_username=request.proxy_username if request.proxy_username else None,
@@ -56,23 +132,136 @@ async def scrape_url(request: ScrapeRequest, api_key: str = Depends(verify_api_k
             proxy_server=request.proxy_server if request.proxy_server else None,
             wait_until=request.wait_until,
             cookies=request.cookies,
+            headers=request.headers,
+            capture=request.capture,
+            human_profile=request.human_profile,
+            human_budget_ms=(
+                request.human_budget_ms
+                if request.human_budget_ms is not None
+                else settings.HUMAN_BEHAVIOR_BUDGET_MS
+            ),
+            tiers=tiers,
+        )
+
+        result = await apply_change_detection(
+            result,
+            selector=request.fingerprint_selector,
+            if_none_match=request.if_none_match,
+            return_diff=request.return_diff,
         )
 
-        return result
+        if format == "raw":
+            return raw_html_response(result)
+        return model_json_response(result)
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
+        logger.exception("Unexpected error: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@app.post("/crawl")
+async def crawl(
+    request: CrawlRequest,
+    http_request: Request,
+    api_key: str = Depends(verify_api_key),
+):
+    """Crawl from seed URLs, streaming one JSON line per page as it completes"""
+    if cluster:
+        # The whole job runs on the node owning the first seed's domain
+        routed = await cluster.route(http_request, str(request.seeds[0]))
+        if routed:
+            return routed
+
+    try:
+        ScraperFactory.get_scraper(request.scraper_type)
+        crawler = Crawler(request)
+    except re.error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid URL pattern: {e}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def stream():
+        async for item in crawler.run():
+            yield item.model_dump_json() + "\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        headers={"X-Crawl-Job-Id": crawler.job_id},
+    )
+
+
 @app.get("/scrapers")
 async def list_scrapers(api_key: str = Depends(verify_api_key)):
     """List available scraper services"""
     return {"available_scrapers": ScraperFactory.get_available_scrapers()}
 
 
+@app.get("/metrics")
+async def metrics(api_key: str = Depends(verify_api_key)):
+    """Event loop lag and Camoufox fingerprint pool statistics"""
+    return {
+        "event_loop": loop_monitor.stats(),
+        "fingerprint_pool": fingerprint_pool.stats(),
+    }
+
+
+@app.get("/debug/profile")
+async def debug_profile(
+    duration: float = Query(5.0, gt=0),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+    top: int = Query(50, ge=1, le=1000),
+    api_key: str = Depends(verify_api_key),
+):
+    """Sample the live event loop and dump all asyncio tasks"""
+    if not settings.DEBUG_ENDPOINTS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if duration > settings.PROFILE_MAX_DURATION_S:
+        raise HTTPException(
+            status_code=400,
+            detail=f"duration must be at most {settings.PROFILE_MAX_DURATION_S}s",
+        )
+
+    # Snapshot tasks first so the await points reflect the moment of the call
+    tasks = dump_tasks()
+    profile = await sample_profile(
+        loop_monitor.loop_thread_id or threading.get_ident(),
+        duration,
+        interval_ms / 1000,
+        top,
+    )
+    return {"profile": profile, "tasks": tasks, "event_loop": loop_monitor.stats()}
+
+
+@app.get("/cluster")
+async def cluster_status(
+    domain: Optional[str] = Query(None, description="Show which node owns this domain"),
+    api_key: str = Depends(verify_api_key),
+):
+    """Cluster membership, peer health and hash ring distribution"""
+    if not cluster:
+        return {"enabled": False}
+    return {"enabled": True, **cluster.status(domain)}
+
+
+@app.get("/timeouts")
+async def timeouts(
+    domain: Optional[str] = Query(None, description="Only show stats for this host"),
+    api_key: str = Depends(verify_api_key),
+):
+    """Learned per-domain latency quantiles and the timeouts derived from them"""
+    return {
+        "enabled": settings.ADAPTIVE_TIMEOUTS_ENABLED,
+        "quantile": settings.ADAPTIVE_TIMEOUT_QUANTILE,
+        "margin": settings.ADAPTIVE_TIMEOUT_MARGIN,
+        "min_samples": settings.ADAPTIVE_TIMEOUT_MIN_SAMPLES,
+        "default_timeout_ms": settings.DEFAULT_TIMEOUT,
+        "entries": latency_tracker.snapshot(domain),
+    }
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
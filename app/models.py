@@ -1,7 +1,7 @@
-from typing import Dict, List, Literal
+from typing import Any, Dict, List, Literal
 from enum import Enum
 from typing import Optional
-from pydantic import BaseModel, HttpUrl  # type: ignore[import-not-found]
+from pydantic import BaseModel, Field, HttpUrl  # type: ignore[import-not-found]
 
 from app.constants.app_data import AppData
 
@@ -9,6 +9,27 @@ from app.constants.app_data import AppData
 class ScraperType(str, Enum):
     BRIGHTDATA_CDP = "brightdata_cdp"
     CAMOUFOX = "camoufox"
+    HTTP = "http"
+    AUTO = "auto"
+
+
+class CaptureConfig(BaseModel):
+    url_patterns: List[str] = Field(
+        ..., min_length=1, description="Glob patterns matched against response URLs"
+    )
+    content_types: List[str] = ["application/json"]
+    wait_for_all: bool = False
+    include_html: bool = True
+    max_responses: int = Field(default=50, ge=1, le=500)
+
+
+class CapturedResponse(BaseModel):
+    url: str
+    status: int
+    content_type: Optional[str] = None
+    pattern: str
+    body: Optional[str] = None
+    data: Optional[Any] = None
 
 
 class ScrapeRequest(BaseModel):
@@ -24,6 +45,13 @@ class ScrapeRequest(BaseModel):
     proxy_password: Optional[str] = None
     proxy_server: Optional[str] = None
     wait_until: Literal["domcontentloaded", "load", "networkidle", "commit"] = "networkidle"
+    capture: Optional[CaptureConfig] = None
+    fast_path: bool = False
+    human_profile: Literal["none", "fast", "natural", "cautious"] = "natural"
+    human_budget_ms: Optional[int] = Field(default=None, ge=0)
+    fingerprint_selector: Optional[str] = None
+    if_none_match: Optional[str] = None
+    return_diff: bool = False
 
 
 class ScrapeResponse(BaseModel):
@@ -35,6 +63,59 @@ class ScrapeResponse(BaseModel):
     scraper_used: ScraperType
     retries_attempted: int
     cookies: Optional[Dict[str, str]] = None  
+    captured_responses: Optional[List[CapturedResponse]] = None
+    fingerprint: Optional[str] = None
+    unchanged: Optional[bool] = None
+    diff: Optional[str] = None
+
+
+class CrawlRequest(BaseModel):
+    seeds: List[HttpUrl] = Field(..., min_length=1)
+    include_patterns: List[str] = Field(
+        default=[], description="Regexes; if set, a URL must match one to be crawled"
+    )
+    exclude_patterns: List[str] = []
+    same_domain: bool = True
+    max_depth: int = Field(default=2, ge=0)
+    max_pages: int = Field(default=100, ge=1)
+    concurrency: int = Field(default=4, ge=1, le=50)
+    include_html: bool = True
+    scraper_type: ScraperType = ScraperType.AUTO
+    selector_to_wait_for: Optional[str] = None
+    timeout: Optional[int] = None
+    headless: bool = True
+    headers: Optional[Dict[str, str]] = None
+    cookies: Optional[Dict[str, str]] = None
+    proxy_url: Optional[str] = None
+    proxy_username: Optional[str] = None
+    proxy_password: Optional[str] = None
+    proxy_server: Optional[str] = None
+    wait_until: Literal["domcontentloaded", "load", "networkidle", "commit"] = "networkidle"
+    human_profile: Literal["none", "fast", "natural", "cautious"] = "fast"
+
+
+class CrawlPageResult(BaseModel):
+    type: Literal["page"] = "page"
+    url: str
+    depth: int
+    success: bool
+    error: Optional[str] = None
+    html: Optional[str] = None
+    content_length: Optional[int] = None
+    links_found: int = 0
+    links_queued: int = 0
+    execution_time: float
+    scraper_used: ScraperType
+
+
+class CrawlSummary(BaseModel):
+    type: Literal["summary"] = "summary"
+    job_id: str
+    pages_crawled: int
+    pages_failed: int
+    urls_discovered: int
+    frontier_remaining: int
+    execution_time: float
 
 
 class HealthResponse(BaseModel):
@@ -0,0 +1,61 @@
+import json
+from typing import Iterator
+
+from fastapi.responses import Response, StreamingResponse  # type: ignore[import-not-found]
+from pydantic import BaseModel  # type: ignore[import-not-found]
+
+from app.models import ScrapeResponse
+
+RAW_CHUNK_SIZE = 64 * 1024
+
+
+def model_json_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Serialize a model with pydantic-core in one pass
+
+    Returning a Response directly skips FastAPI's response_model re-validation
+    and jsonable_encoder walk, which copy large HTML strings several times.
+    """
+    return Response(
+        content=model.model_dump_json(),
+        status_code=status_code,
+        media_type="application/json",
+    )
+
+
+def _iter_chunks(body: bytes) -> Iterator[memoryview]:
+    view = memoryview(body)
+    for offset in range(0, len(view), RAW_CHUNK_SIZE):
+        yield view[offset : offset + RAW_CHUNK_SIZE]
+
+
+def raw_html_response(result: ScrapeResponse) -> Response:
+    """Stream the HTML body as-is, with the metadata moved to headers"""
+    if not result.success:
+        return model_json_response(result, status_code=502)
+
+    headers = {
+        "X-Scrape-Success": "true",
+        "X-Scraper-Used": result.scraper_used.value,
+        "X-Execution-Time": f"{result.execution_time:.3f}",
+        "X-Retries-Attempted": str(result.retries_attempted),
+        "X-Content-Length": str(result.content_length or 0),
+    }
+    if result.cookies:
+        headers["X-Scrape-Cookies"] = json.dumps(result.cookies, separators=(",", ":"))
+    if result.fingerprint:
+        headers["ETag"] = f'"{result.fingerprint}"'
+
+    if result.unchanged:
+        return Response(status_code=304, headers=headers)
+    if result.html is None:
+        # Diff or capture-only results have no HTML body to stream
+        return model_json_response(result)
+
+    body = result.html.encode("utf-8")
+    # Drop the str so only the encoded copy stays alive while streaming
+    result.html = None
+    return StreamingResponse(
+        _iter_chunks(body),
+        media_type="text/html; charset=utf-8",
+        headers=headers,
+    )
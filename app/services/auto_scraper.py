@@ -0,0 +1,112 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.config import settings
+from app.models import ScrapeResponse, ScraperType
+from app.services.base import BaseScraper
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIERS = [ScraperType.HTTP, ScraperType.CAMOUFOX, ScraperType.BRIGHTDATA_CDP]
+
+
+class AutoScraper(BaseScraper):
+    """Try the cheapest tier first and escalate to a browser only when needed"""
+
+    def __init__(self, scrapers: Dict[ScraperType, BaseScraper]) -> None:
+        self._scrapers = scrapers
+        # domain -> (tier that last worked, expiry timestamp), least recently used first
+        self._tier_memory: "OrderedDict[str, Tuple[ScraperType, float]]" = OrderedDict()
+
+    @property
+    def name(self) -> ScraperType:
+        return ScraperType.AUTO
+
+    async def initialize(self) -> None:
+        """Tiers are owned and initialized by the factory"""
+        logger.info("Auto scraper initialized")
+
+    async def cleanup(self) -> None:
+        self._tier_memory.clear()
+        logger.info("Auto scraper cleaned up")
+
+    def remembered_tier(self, domain: str) -> Optional[ScraperType]:
+        """Return the tier that last worked for a domain, if still fresh"""
+        entry = self._tier_memory.get(domain)
+        if not entry:
+            return None
+        tier, expires_at = entry
+        if expires_at < time.time():
+            del self._tier_memory[domain]
+            return None
+        self._tier_memory.move_to_end(domain)
+        return tier
+
+    def remember_tier(self, domain: str, tier: ScraperType) -> None:
+        self._tier_memory[domain] = (tier, time.time() + settings.TIER_MEMORY_TTL)
+        self._tier_memory.move_to_end(domain)
+        while len(self._tier_memory) > settings.TIER_MEMORY_MAX_DOMAINS:
+            self._tier_memory.popitem(last=False)
+
+    def _plan(
+        self, domain: str, tiers: List[ScraperType], capture: bool
+    ) -> List[ScraperType]:
+        available = [tier for tier in tiers if tier in self._scrapers]
+        if capture:
+            # Network capture needs a real page; a plain HTTP fetch has no XHRs
+            available = [tier for tier in available if tier != ScraperType.HTTP]
+
+        remembered = self.remembered_tier(domain)
+        if remembered in available:
+            # Skip the tiers that were futile last time
+            return available[available.index(remembered):]
+        return available
+
+    async def scrape(
+        self,
+        url: str,
+        selector_to_wait_for: Optional[str] = None,
+        timeout: Optional[int] = None,
+        headless: bool = True,
+        proxy_url: Optional[str] = None,
+        proxy_username: Optional[str] = None,
+        proxy_password: Optional[str] = None,
+        proxy_server: Optional[str] = None,
+        tiers: Optional[List[ScraperType]] = None,
+        **kwargs,
+    ) -> ScrapeResponse:
+        start_time = time.time()
+        domain = urlparse(url).hostname or ""
+        plan = self._plan(domain, tiers or DEFAULT_TIERS, bool(kwargs.get("capture")))
+        if not plan:
+            raise ValueError("No scraper tiers available")
+
+        retries = 0
+        result: Optional[ScrapeResponse] = None
+        for tier in plan:
+            logger.info("Trying %s tier for %s", tier.value, url)
+            result = await self._scrapers[tier].scrape(
+                url=url,
+                selector_to_wait_for=selector_to_wait_for,
+                timeout=timeout,
+                headless=headless,
+                proxy_url=proxy_url,
+                proxy_username=proxy_username,
+                proxy_password=proxy_password,
+                proxy_server=proxy_server,
+                **kwargs,
+            )
+            retries += result.retries_attempted
+
+            if result.success:
+                self.remember_tier(domain, tier)
+                break
+
+            logger.info("Escalating from %s for %s: %s", tier.value, url, result.error)
+
+        result.execution_time = time.time() - start_time
+        result.retries_attempted = retries
+        return result
@@ -12,7 +12,7 @@ class BaseScraper(ABC):
         self,
         url: str,
         selector_to_wait_for: Optional[str] = None,
-        timeout: int = 30000,
+        timeout: Optional[int] = None,
         headless: bool = True,
         proxy_url: Optional[str] = None,
         proxy_username: Optional[str] = None,
@@ -2,11 +2,15 @@ import asyncio
 import logging
 import random
 import time
-from typing import Optional, Tuple, Dict
+from typing import List, Optional, Tuple, Dict
 from playwright.async_api import Playwright, async_playwright, ViewportSize  # type: ignore[import-not-found]
 from app.config import settings
-from app.models import ScrapeResponse, ScraperType
+from app.models import CaptureConfig, CapturedResponse, ScrapeResponse, ScraperType
 from app.services.base import BaseScraper
+from app.services.capture import NetworkCapture
+from app.services.human import HumanBehavior
+from app.services.resource_cache import ResourceRouter, resource_blocklist
+from app.services.timeouts import latency_tracker
 
 logger = logging.getLogger(__name__)
 
@@ -36,44 +40,66 @@ class BrightDataCDPScraper(BaseScraper):
         self,
         url: str,
         selector_to_wait_for: Optional[str] = None,
-        timeout: int = 30000,
+        timeout: Optional[int] = None,
         headless: bool = True,
         proxy_url: Optional[str] = None,
         proxy_username: Optional[str] = None,
         proxy_password: Optional[str] = None,
         proxy_server: Optional[str] = None,
         wait_until: str = "networkidle",
+        capture: Optional[CaptureConfig] = None,
+        human_profile: str = "natural",
+        human_budget_ms: Optional[int] = None,
         **kwargs,
     ) -> ScrapeResponse:
         start_time = time.time()
         retries = 0
         max_retries = 3
+        human_behavior = HumanBehavior(human_profile, human_budget_ms)
+        # Learned per domain unless the client pinned a timeout
+        navigation_timeout = latency_tracker.resolve(
+            timeout, url, self.name.value, f"navigation:{wait_until}"
+        )
+        selector_timeout = latency_tracker.resolve(
+            timeout, url, self.name.value, "selector", selector_to_wait_for
+        )
 
         for attempt in range(max_retries + 1):
             try:
 
                 async with BRIGHTDATA_SEMAPHORE:
-                    content, cookies = await self._scrape_with_brightdata_cdp(
-                    url, selector_to_wait_for, timeout, headless, wait_until
-                )
+                    content, cookies, captured = await self._scrape_with_brightdata_cdp(
+                        url,
+                        selector_to_wait_for,
+                        navigation_timeout,
+                        headless,
+                        wait_until,
+                        capture,
+                        human_behavior,
+                        selector_timeout,
+                    )
 
                 execution_time = time.time() - start_time
                 content_length = len(content) if content else 0
 
-                # Validate content quality
-                if content_length < 10000:
+                # Validate content quality (captured API responses are the payload)
+                if content_length < 10000 and not captured:
                     logger.warning(
-                        f"Content too short ({content_length} chars) for {url}"
+                        "Content too short (%s chars) for %s", content_length, url
                     )
                     if attempt < max_retries:
                         retries += 1
                         await asyncio.sleep(2**attempt)  # Exponential backoff
                         continue
 
+                if capture and not capture.include_html:
+                    content = None
+
                 return ScrapeResponse(
                     success=True,
                     html=content,
                     cookies=cookies,
+                    captured_responses=captured if capture else None,
                     content_length=content_length,
                     execution_time=execution_time,
                     scraper_used=self.name,
@@ -82,7 +108,10 @@ class BrightDataCDPScraper(BaseScraper):
 
             except Exception as e:
                 logger.error(
-                    f"BrightData scrape attempt {attempt + 1} failed for {url}: {e}"
+                    "BrightData scrape attempt %s failed for %s: %s",
+                    attempt + 1,
+                    url,
+                    e,
                 )
                 retries += 1
 
@@ -116,7 +145,10 @@ class BrightDataCDPScraper(BaseScraper):
         timeout: int = 30000,
         headless: bool = True,
         wait_until: str = "networkidle",
-    ) -> Tuple[str, Dict[str, str]]:
+        capture: Optional[CaptureConfig] = None,
+        human_behavior: Optional[HumanBehavior] = None,
+        selector_timeout: Optional[int] = None,
+    ) -> Tuple[str, Dict[str, str], List[CapturedResponse]]:
         if not self.playwright:
             raise ValueError("Playwright not initialized")
 
@@ -124,6 +156,11 @@ class BrightDataCDPScraper(BaseScraper):
 
         try:
             page = await browser.new_page()
+            network_capture = NetworkCapture(capture) if capture else None
+
+            # Block trackers in the remote browser; intercepting would cost a
+            # round trip to this server per request
+            await ResourceRouter(None, resource_blocklist).attach_remote(page)
 
             viewport_sizes = [
                 {"width": 1920, "height": 1080},  # Full HD
@@ -141,19 +178,38 @@ class BrightDataCDPScraper(BaseScraper):
                 )
             )
             logger.debug(
-                f"Set viewport size to viewport: {viewport['width']}x{viewport['height']}"
+                "Set viewport size to viewport: %sx%s",
+                viewport['width'],
+                viewport['height'],
             )
 
             random_delay = random.uniform(3.0, 8.0)
             logger.debug(
-                f"Waiting for {random_delay} seconds before navigating to {url}"
+                "Waiting for %s seconds before navigating to %s", random_delay, url
             )
             await page.wait_for_timeout(random_delay * 1000)
 
-            logger.info(f"Navigating to {url}")
-            # await page.goto(url, timeout=timeout, wait_until="networkidle")
-            print(f"logging wait_until: {wait_until}")
-            await page.goto(url, timeout=timeout, wait_until=wait_until)
+            if network_capture:
+                network_capture.attach(page)
+
+            logger.info("Navigating to %s", url)
+            if network_capture and capture.wait_for_all:
+                # Return as soon as every declared capture has arrived
+                await page.goto(url, timeout=timeout, wait_until="commit")
+                await network_capture.wait(timeout)
+                network_capture.detach(page)
+                captured = await network_capture.drain()
+                content = await page.content()
+                cookies_list = await page.context.cookies()
+                cookies_dict = {cookie['name']: cookie['value'] for cookie in cookies_list}
+                logger.info("✅ Captured %s responses for %s", len(captured), url)
+                return content, cookies_dict, captured
+
+            logger.debug("Navigating with wait_until=%s", wait_until)
+            with latency_tracker.measure(
+                url, self.name.value, f"navigation:{wait_until}", timeout
+            ):
+                await page.goto(url, timeout=timeout, wait_until=wait_until)
             await page.wait_for_timeout(5000)
 
             if selector_to_wait_for:
@@ -161,7 +217,7 @@ class BrightDataCDPScraper(BaseScraper):
                 page_title = await page.title()
                 if "access denied" in page_title.lower():
                     logger.warning(
-                        f"⚠️ Access denied detected for {url} - skipping selector wait"
+                        "⚠️ Access denied detected for %s - skipping selector wait", url
                     )
                     raise Exception(f"Access denied: {page_title}")
 
@@ -169,123 +225,52 @@ class BrightDataCDPScraper(BaseScraper):
                 content = await page.content()
                 if len(content) < 2000:  # Most business pages are much longer
                     logger.warning(
-                        f"⚠️ Page content too short ({len(content)} chars) - likely error page"
+                        "⚠️ Page content too short (%s chars) - likely error page",
+                        len(content),
                     )
                     raise Exception(
                         f"Page content too short: {len(content)} characters"
                     )
 
                 # Now proceed with normal selector waiting
-                logger.info(f"Waiting for selector: {selector_to_wait_for}")
+                logger.info("Waiting for selector: %s", selector_to_wait_for)
 
-                # Add comprehensive logging before waiting for selector
-                try:
-                    # Log page title and URL
-                    page_title = await page.title()
-                    current_url = page.url
-                    logger.info(
-                        f"Page title: '{page_title}' | Current URL: {current_url}"
+                # Diagnostics cost extra CDP round trips, so only collect them at debug
+                if logger.isEnabledFor(logging.DEBUG):
+                    await self._log_selector_diagnostics(
+                        page, selector_to_wait_for, len(content)
                     )
 
-                    # Log page content length
-                    content_before = await page.content()
-                    logger.info(
-                        f"Page content length before selector wait: {len(content_before)} characters"
-                    )
-
-                    # Log if selector exists in DOM (even if not visible)
-                    selector_exists = await page.query_selector(selector_to_wait_for)
-                    if selector_exists:
-                        logger.info(
-                            f"✅ Selector '{selector_to_wait_for}' found in DOM"
-                        )
-                        # Check if it's visible
-                        is_visible = await selector_exists.is_visible()
-                        logger.info(f"Selector visibility: {is_visible}")
-                    else:
-                        logger.warning(
-                            f"❌ Selector '{selector_to_wait_for}' NOT found in DOM"
+                selector_timeout = selector_timeout or timeout
+                try:
+                    with latency_tracker.measure(
+                        url,
+                        self.name.value,
+                        "selector",
+                        selector_timeout,
+                        selector_to_wait_for,
+                    ):
+                        await page.wait_for_selector(
+                            selector_to_wait_for, timeout=selector_timeout
                         )
-
-                        # Log alternative selectors that might exist
-                        alternative_selectors = [
-                            "h1",
-                            ".title",
-                            "[class*='title']",
-                            "[class*='Title']",
-                        ]
-                        for alt_selector in alternative_selectors:
-                            alt_element = await page.query_selector(alt_selector)
-                            if alt_element:
-                                alt_text = await alt_element.text_content()
-                                logger.info(
-                                    f"Alternative selector '{alt_selector}' found with text: '{alt_text[:100]}...'"
-                                )
-
-                    # Log page HTML structure around where we expect the title
-                    try:
-                        # Look for any h1 elements
-                        h1_elements = await page.query_selector_all("h1")
-                        logger.info(f"Found {len(h1_elements)} h1 elements on page")
-                        for i, h1 in enumerate(h1_elements):
-                            h1_text = await h1.text_content()
-                            h1_class = await h1.get_attribute("class")
-                            logger.info(
-                                f"H1[{i}]: class='{h1_class}', text='{h1_text[:100]}...'"
-                            )
-                    except Exception as e:
-                        logger.warning(f"Error checking h1 elements: {e}")
-
-                    # Now wait for the selector with timeout
-                    await page.wait_for_selector(selector_to_wait_for, timeout=timeout)
                     logger.info(
-                        f"✅ Selector '{selector_to_wait_for}' successfully found and visible"
+                        "✅ Selector '%s' successfully found and visible",
+                        selector_to_wait_for,
                     )
 
                 except Exception as e:
                     logger.error(
-                        f"❌ Selector '{selector_to_wait_for}' timeout or error: {e}"
+                        "❌ Selector '%s' timeout or error: %s", selector_to_wait_for, e
                     )
-
-                    # Log final page state for debugging
-                    try:
-                        final_title = await page.title()
-                        final_url = page.url
-                        final_content = await page.content()
-
-                        logger.error(f"=== PAGE STATE AT TIMEOUT ===")
-                        logger.error(f"Final page title: '{final_title}'")
-                        logger.error(f"Final URL: {final_url}")
-                        logger.error(
-                            f"Final content length: {len(final_content)} characters"
-                        )
-
-                        # Log first 1000 characters of content for debugging
-                        content_preview = final_content[:1000]
-                        logger.error(f"Content preview: {content_preview}")
-
-                        # Check if page has any content at all
-                        if len(final_content) < 1000:
-                            logger.error(
-                                f"⚠️ Page content seems very short - possible loading issue"
-                            )
-
-                        # Log any error messages or challenge indicators
-                        if "error" in final_content.lower():
-                            logger.error("⚠️ Page contains error messages")
-                        if "challenge" in final_content.lower():
-                            logger.error("⚠️ Page contains challenge indicators")
-                        if "access denied" in final_content.lower():
-                            logger.error("⚠️ Page shows access denied")
-
-                    except Exception as log_error:
-                        logger.error(f"Error logging final page state: {log_error}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        await self._log_page_state(page)
 
                     raise e
 
             await page.wait_for_timeout(2000)
 
-            await self._simulate_human_behavior(page, viewport)
+            if human_behavior:
+                await human_behavior.run(page, viewport)
 
             logger.info("Waiting for page to stabilize...")
             try:
@@ -299,7 +284,7 @@ class BrightDataCDPScraper(BaseScraper):
 
             # Handle anti-bot challenges
             if "chlgeId" in content or "challenge" in content.lower():
-                logger.info(f"Anti-bot challenge detected for {url}")
+                logger.info("Anti-bot challenge detected for %s", url)
                 content = await self._handle_challenge(
                     page, selector_to_wait_for, timeout
                 )
@@ -307,72 +292,95 @@ class BrightDataCDPScraper(BaseScraper):
             cookies_list = await page.context.cookies()
             cookies_dict = {cookie['name']: cookie['value'] for cookie in cookies_list}
 
+            captured: List[CapturedResponse] = []
+            if network_capture:
+                network_capture.detach(page)
+                captured = await network_capture.drain()
+
             content_length = len(content)
-            logger.info(f"✅ Content length: {content_length} characters, cookies captured: {len(cookies_dict)}")
+            logger.info(
+                "✅ Content length: %s characters, cookies captured: %s, responses captured: %s",
+                content_length,
+                len(cookies_dict),
+                len(captured),
+            )
 
-            return content, cookies_dict
+            return content, cookies_dict, captured
 
         finally:
             await browser.close()
             logger.info("✅ Browser closed")
 
-    async def _simulate_human_behavior(self, page, viewport):
-        """Simulate human-like mouse movements and scrolling"""
+    async def _log_selector_diagnostics(
+        self, page, selector_to_wait_for: str, content_length: int
+    ) -> None:
+        """Log what the page looks like before waiting for a selector (debug only)"""
         try:
-            # Your existing human behavior simulation logic
-            start_x, start_y = 400, 300
-            num_points = random.randint(4, 8)
-            points = []
-            current_x, current_y = start_x, start_y
-
-            for i in range(num_points):
-                if i == 0:
-                    x = current_x + random.randint(-100, 100)
-                    y = current_y + random.randint(-80, 80)
-                else:
-                    max_jump = min(150, viewport["width"] // 6)
-                    x = current_x + random.randint(-max_jump, max_jump)
-                    y = current_y + random.randint(-max_jump, max_jump)
-
-                x = max(50, min(viewport["width"] - 50, x))
-                y = max(50, min(viewport["height"] - 50, y))
-                points.append((x, y))
-                current_x, current_y = x, y
-
-            # Move through waypoints with realistic timing
-            for i, (x, y) in enumerate(points):
-                if i > 0:
-                    prev_x, prev_y = points[i - 1]
-                    distance = ((x - prev_x) ** 2 + (y - prev_y) ** 2) ** 0.5
-                    speed = random.uniform(300, 700)
-                    move_time = distance / speed * random.uniform(0.8, 1.2)
-                else:
-                    move_time = random.uniform(0.1, 0.3)
-
-                await page.mouse.move(x, y)
-                await page.wait_for_timeout(move_time * 1000)
-
-                if random.random() < 0.3:
-                    pause_time = random.uniform(0.2, 0.8)
-                    await page.wait_for_timeout(pause_time * 1000)
-
-            # Realistic scrolling
-            if random.random() < 0.7:  # 70% chance to scroll
-                await page.mouse.wheel(0, random.randint(-200, 200))
-                await page.wait_for_timeout(random.uniform(200, 500))
+            selector_element = await page.query_selector(selector_to_wait_for)
+            is_visible = (
+                await selector_element.is_visible() if selector_element else False
+            )
 
-            natural_pause = random.uniform(800, 2500)
-            await page.wait_for_timeout(natural_pause)
+            # Alternative selectors that might hold the title
+            alternatives = {}
+            if not selector_element:
+                for alt_selector in ["h1", ".title", "[class*='title']", "[class*='Title']"]:
+                    alt_element = await page.query_selector(alt_selector)
+                    if alt_element:
+                        alt_text = await alt_element.text_content()
+                        alternatives[alt_selector] = (alt_text or "")[:100]
+
+            h1_elements = []
+            for h1 in await page.query_selector_all("h1"):
+                h1_elements.append(
+                    {
+                        "class": await h1.get_attribute("class"),
+                        "text": ((await h1.text_content()) or "")[:100],
+                    }
+                )
 
+            logger.debug(
+                "Page state before selector wait",
+                extra={
+                    "page_title": await page.title(),
+                    "page_url": page.url,
+                    "content_length": content_length,
+                    "selector": selector_to_wait_for,
+                    "selector_in_dom": selector_element is not None,
+                    "selector_visible": is_visible,
+                    "alternative_selectors": alternatives,
+                    "h1_elements": h1_elements,
+                },
+            )
         except Exception as e:
-            logger.warning(f"Human behavior simulation failed: {e}")
+            logger.debug("Error collecting selector diagnostics: %s", e)
+
+    async def _log_page_state(self, page) -> None:
+        """Log a snapshot of the page after a selector timeout (debug only)"""
+        try:
+            final_content = await page.content()
+            lowered = final_content.lower()
+            logger.debug(
+                "=== PAGE STATE AT TIMEOUT ===",
+                extra={
+                    "page_title": await page.title(),
+                    "page_url": page.url,
+                    "content_length": len(final_content),
+                    "content_preview": final_content[:1000],
+                    "has_error_text": "error" in lowered,
+                    "has_challenge_text": "challenge" in lowered,
+                    "has_access_denied_text": "access denied" in lowered,
+                },
+            )
+        except Exception as log_error:
+            logger.debug("Error logging final page state: %s", log_error)
 
     async def _handle_challenge(self, page, selector_to_wait_for, timeout) -> str:
         """Handle anti-bot challenges using staged waiting strategy"""
         logger.info("Using staged waiting strategy to resolve challenge...")
 
         for stage in range(3):
-            logger.info(f"Challenge resolution stage {stage + 1}/3...")
+            logger.info("Challenge resolution stage %s/3...", stage + 1)
             await page.wait_for_timeout(4000)
 
             try:
@@ -392,7 +400,7 @@ class BrightDataCDPScraper(BaseScraper):
                 title_element_found = title_element is not None
                 if title_element_found:
                     logger.info(
-                        f"✅ Found {selector_to_wait_for} - page appears fully loaded!"
+                        "✅ Found %s - page appears fully loaded!", selector_to_wait_for
                     )
             except Exception:
                 pass
@@ -401,6 +409,6 @@ class BrightDataCDPScraper(BaseScraper):
                 logger.info("✅ Challenge resolved!")
                 break
             else:
-                logger.info(f"Challenge still active after stage {stage + 1}")
+                logger.info("Challenge still active after stage %s", stage + 1)
 
         return await page.content()
\ No newline at end of file
@@ -0,0 +1,182 @@
+import asyncio
+import copy
+import ipaddress
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+from urllib.parse import quote
+
+import httpx  # type: ignore[import-not-found]
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Plain-text "what is my IP" services, tried in order
+IP_LOOKUP_URLS = [
+    "https://api.ipify.org",
+    "https://checkip.amazonaws.com",
+    "https://ipinfo.io/ip",
+]
+
+
+def proxy_key(proxy: Optional[Dict[str, str]]) -> str:
+    """Identify a proxy exit; residential providers encode the session in the username"""
+    if not proxy:
+        return "direct"
+    return f"{proxy['server']}|{proxy.get('username') or ''}"
+
+
+def _proxy_url(proxy: Dict[str, str]) -> str:
+    server = proxy["server"]
+    if "://" not in server:
+        server = f"http://{server}"
+    if proxy.get("username"):
+        scheme, rest = server.split("://", 1)
+        credentials = quote(proxy["username"], safe="")
+        if proxy.get("password"):
+            credentials += f":{quote(proxy['password'], safe='')}"
+        server = f"{scheme}://{credentials}@{rest}"
+    return server
+
+
+class ExitIpCache:
+    """Exit IP per proxy with a TTL, so geoip resolution skips the network lookup
+
+    Failed lookups are cached too, for a shorter TTL, so an unreachable lookup
+    service doesn't add its timeouts to every launch.
+    """
+
+    def __init__(self, ttl: int, failure_ttl: int) -> None:
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self._entries: Dict[str, Tuple[Optional[str], float]] = {}
+        # Lookups in flight; entries are removed as soon as they finish
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    async def resolve(self, proxy: Dict[str, str]) -> Optional[str]:
+        key = proxy_key(proxy)
+        entry = self._entries.get(key)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+
+        # Concurrent launches through the same proxy share one lookup
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.create_task(self._lookup_and_store(key, proxy))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        # A cancelled launch must not cancel the lookup others are waiting on
+        return await asyncio.shield(task)
+
+    async def _lookup_and_store(self, key: str, proxy: Dict[str, str]) -> Optional[str]:
+        ip = await self._lookup(proxy)
+        now = time.monotonic()
+        for stale in [k for k, (_, expires) in self._entries.items() if expires <= now]:
+            del self._entries[stale]
+        self._entries[key] = (ip, now + (self.ttl if ip else self.failure_ttl))
+        return ip
+
+    async def _lookup(self, proxy: Dict[str, str]) -> Optional[str]:
+        async with httpx.AsyncClient(proxy=_proxy_url(proxy), timeout=10) as client:
+            for url in IP_LOOKUP_URLS:
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                    return str(ipaddress.ip_address(response.text.strip()))
+                except (httpx.HTTPError, ValueError) as e:
+                    logger.debug("Exit IP lookup via %s failed: %s", url, e)
+        logger.warning("Could not resolve exit IP for proxy %s", proxy["server"])
+        return None
+
+
+class FingerprintPool:
+    """Pre-generated Camoufox fingerprints, optionally pinned per (domain, proxy)
+
+    Generation runs in a worker thread and the pool is topped up in the
+    background, so a launch normally just pops a ready fingerprint.
+    """
+
+    def __init__(self, size: int, pin_ttl: int, max_pins: int) -> None:
+        self.size = size
+        self.pin_ttl = pin_ttl
+        self.max_pins = max_pins
+        self._ready: Deque[Any] = deque()
+        self._pins: "OrderedDict[Tuple[str, str], Tuple[Any, float]]" = OrderedDict()
+        self._refill_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _generate() -> Any:
+        from camoufox.fingerprints import generate_fingerprint
+
+        return generate_fingerprint()
+
+    async def get(self, domain: str, proxy: Optional[Dict[str, str]]) -> Any:
+        if not settings.CAMOUFOX_PIN_FINGERPRINTS:
+            return await self._take()
+
+        key = (domain, proxy_key(proxy))
+        pinned = self._pins.get(key)
+        if pinned and pinned[1] > time.monotonic():
+            self._pins.move_to_end(key)
+            # Launch option handling may touch the fingerprint; keep the pin intact
+            return copy.deepcopy(pinned[0])
+
+        fingerprint = await self._take()
+        if fingerprint is None:
+            return None
+        self._pins[key] = (fingerprint, time.monotonic() + self.pin_ttl)
+        self._pins.move_to_end(key)
+        while len(self._pins) > self.max_pins:
+            self._pins.popitem(last=False)
+        return copy.deepcopy(fingerprint)
+
+    async def _take(self) -> Any:
+        """Pop a ready fingerprint; None lets Camoufox generate one at launch"""
+        self._schedule_refill()
+        if self._ready:
+            return self._ready.popleft()
+        try:
+            return await asyncio.to_thread(self._generate)
+        except Exception as e:
+            logger.warning("Fingerprint generation failed: %s", e)
+            return None
+
+    def _schedule_refill(self) -> None:
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill())
+
+    async def _refill(self) -> None:
+        while len(self._ready) < self.size:
+            try:
+                self._ready.append(await asyncio.to_thread(self._generate))
+            except Exception as e:
+                logger.warning("Fingerprint generation failed: %s", e)
+                return
+
+    async def start(self) -> None:
+        if self.size > 0:
+            self._schedule_refill()
+
+    async def stop(self) -> None:
+        if self._refill_task:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+            self._refill_task = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"ready": len(self._ready), "pinned": len(self._pins)}
+
+
+exit_ip_cache = ExitIpCache(
+    settings.CAMOUFOX_GEOIP_CACHE_TTL, settings.CAMOUFOX_GEOIP_FAILURE_TTL
+)
+fingerprint_pool = FingerprintPool(
+    settings.CAMOUFOX_FINGERPRINT_POOL_SIZE,
+    settings.CAMOUFOX_FINGERPRINT_PIN_TTL,
+    settings.CAMOUFOX_FINGERPRINT_PIN_MAX,
+)
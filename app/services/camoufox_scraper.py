@@ -1,12 +1,22 @@
 import asyncio
 import logging
-import random
 import time
 from camoufox.async_api import AsyncCamoufox
 from playwright.async_api import Browser, Page, ViewportSize
-from typing import Optional, Tuple, Dict
-from app.models import ScraperType, ScrapeResponse
+from typing import List, Optional, Tuple, Dict
+from urllib.parse import urlsplit
+from app.config import settings
+from app.models import CaptureConfig, CapturedResponse, ScraperType, ScrapeResponse
 from app.services.base import BaseScraper
+from app.services.browser_profiles import exit_ip_cache, fingerprint_pool
+from app.services.capture import NetworkCapture
+from app.services.human import HumanBehavior
+from app.services.resource_cache import (
+    ResourceRouter,
+    resource_blocklist,
+    resource_cache,
+)
+from app.services.timeouts import latency_tracker
 
 logger = logging.getLogger(__name__)
 
@@ -22,63 +32,83 @@ class CamoufoxScraper(BaseScraper):
         return ScraperType.CAMOUFOX
 
     async def initialize(self) -> None:
-        """Initialize Camoufox scraper (no persistent state needed)"""
+        """Initialize Camoufox scraper and start pre-generating fingerprints"""
+        await fingerprint_pool.start()
         logger.info("Camoufox Scraper initialized")
 
     async def cleanup(self) -> None:
-        """Cleanup (no persistent state to clean)"""
+        """Stop background fingerprint generation"""
+        await fingerprint_pool.stop()
         logger.info("Camoufox Scraper cleaned up")
 
     async def scrape(
         self,
         url: str,
         selector_to_wait_for: Optional[str] = None,
-        timeout: int = 30000,
+        timeout: Optional[int] = None,
         headless: bool = True,
         proxy_url: Optional[str] = None,
         proxy_username: Optional[str] = None,
         proxy_password: Optional[str] = None,
         proxy_server: Optional[str] = None,
         cookies: Optional[Dict[str, str]] = None,
+        capture: Optional[CaptureConfig] = None,
+        human_profile: str = "natural",
+        human_budget_ms: Optional[int] = None,
         **kwargs,
     ) -> ScrapeResponse:
         start_time = time.time()
         retries = 0
 
         max_retries = 3
+        human_behavior = HumanBehavior(human_profile, human_budget_ms)
+        # Learned per domain unless the client pinned a timeout
+        navigation_timeout = latency_tracker.resolve(
+            timeout, url, self.name.value, "navigation:networkidle"
+        )
+        selector_timeout = latency_tracker.resolve(
+            timeout, url, self.name.value, "selector", selector_to_wait_for
+        )
 
         for attempt in range(max_retries + 1):
             try:
                 async with BROWSER_SEMAPHORE:
-                    content, cookies = await self._scrape_with_camoufox(
+                    content, cookies, captured = await self._scrape_with_camoufox(
                         url,
                         selector_to_wait_for,
-                        timeout,
+                        navigation_timeout,
                         headless,
                         proxy_url,
                         proxy_username,
                         proxy_password,
                         proxy_server,
                         cookies,
+                        capture,
+                        human_behavior,
+                        selector_timeout,
                     )
 
                 execution_time = time.time() - start_time
                 content_length = len(content) if content else 0
 
-                # Validate content quality
-                if content_length < 10000:
+                # Validate content quality (captured API responses are the payload)
+                if content_length < 10000 and not captured:
                     logger.warning(
-                        f"Content too short ({content_length} chars) for {url}"
+                        "Content too short (%s chars) for %s", content_length, url
                     )
                     if attempt < max_retries:
                         retries += 1
                         await asyncio.sleep(2**attempt)
                         continue
 
+                if capture and not capture.include_html:
+                    content = None
+
                 return ScrapeResponse(
                     success=True,
                     html=content,
                     cookies=cookies,
+                    captured_responses=captured if capture else None,
                     content_length=content_length,
                     execution_time=execution_time,
                     scraper_used=self.name,
@@ -86,7 +116,9 @@ class CamoufoxScraper(BaseScraper):
                 )
 
             except Exception as e:
-                logger.error(f"Camoufox attempt {attempt + 1} failed for {url}: {e}")
+                logger.error(
+                    "Camoufox attempt %s failed for %s: %s", attempt + 1, url, e
+                )
                 retries += 1
 
                 if attempt < max_retries:
@@ -113,29 +145,44 @@ class CamoufoxScraper(BaseScraper):
         proxy_password: Optional[str] = None,
         proxy_server: Optional[str] = None,
         cookies: Optional[Dict[str, str]] = None,
-    ) -> Tuple[str, Dict[str, str]]:
+        capture: Optional[CaptureConfig] = None,
+        human_behavior: Optional[HumanBehavior] = None,
+        selector_timeout: Optional[int] = None,
+    ) -> Tuple[str, Dict[str, str], List[CapturedResponse]]:
         """Scrape with proper Camoufox usage and typing"""
 
         if proxy_server and proxy_username and proxy_password:
-            logger.info(f"Using proxy: {proxy_server}")
+            logger.info("Using proxy: %s", proxy_server)
             proxy = {
                 "server": proxy_server,
                 "username": proxy_username,
                 "password": proxy_password,
             }
-            geoip = True
+            # A cached exit IP skips Camoufox's own lookup through the proxy.
+            # geoip=True would repeat the failed lookup synchronously on the
+            # event loop, so without an IP the launch goes without geoip.
+            geoip = await exit_ip_cache.resolve(proxy)
+            if geoip is None:
+                logger.warning("Launching without geoip: exit IP of %s unknown", proxy_server)
+                geoip = False
         else:
             proxy = None
             geoip = False
 
+        fingerprint = await fingerprint_pool.get(urlsplit(url).hostname or "", proxy)
+
         async with AsyncCamoufox(
             headless=headless,
             proxy=proxy,
             geoip=geoip,
+            fingerprint=fingerprint,
+            # Generated by Camoufox itself, so its custom-fingerprint warning doesn't apply
+            i_know_what_im_doing=True,
         ) as browser:
 
             # Create a new page
             page: Page = await browser.new_page()
+            network_capture = NetworkCapture(capture) if capture else None
 
             try:
 
@@ -148,17 +195,21 @@ class CamoufoxScraper(BaseScraper):
                             'url': url 
                         })
                     await page.context.add_cookies(formatted_cookies)
-                    logger.info(f"Injected {len(cookies)} cookies into Camoufox")
+                    logger.info("Injected %s cookies into Camoufox", len(cookies))
 
-                # Block images, media, fonts, and stylesheets
-                await page.route("**/*", lambda route: route.abort() 
-                    if route.request.resource_type in ["image", "media", "font", "stylesheet"] 
-                    else route.continue_()
-                )
+                # Block heavy resource types and trackers, serve cached assets
+                await ResourceRouter(
+                    resource_cache,
+                    resource_blocklist,
+                    settings.BLOCKED_RESOURCE_TYPES,
+                ).attach(page)
 
                 # Set viewport
+                viewport = {"width": 1920, "height": 1080}
                 await page.set_viewport_size(
-                    viewport_size=ViewportSize(width=1920, height=1080)
+                    viewport_size=ViewportSize(
+                        width=viewport["width"], height=viewport["height"]
+                    )
                 )
 
                 # Add stealth scripts
@@ -168,53 +219,77 @@ class CamoufoxScraper(BaseScraper):
                     });
                 """)
 
+                if network_capture:
+                    network_capture.attach(page)
+
                 # Navigate to URL
-                logger.info(f"Navigating to {url}")
+                logger.info("Navigating to %s", url)
+                if network_capture and capture.wait_for_all:
+                    # Return as soon as every declared capture has arrived
+                    await page.goto(url, timeout=timeout, wait_until="commit")
+                    await network_capture.wait(timeout)
+                    return await self._collect(page, network_capture, url)
+
                 try:
-                    await page.goto(url, timeout=timeout, wait_until="networkidle")
+                    with latency_tracker.measure(
+                        url, self.name.value, "navigation:networkidle", timeout
+                    ):
+                        await page.goto(url, timeout=timeout, wait_until="networkidle")
                 except Exception as e:
-                    logger.warning(f"networkidle failed, trying domcontentloaded: {e}")
+                    logger.warning("networkidle failed, trying domcontentloaded: %s", e)
                     await page.goto(url, timeout=timeout, wait_until="domcontentloaded")
                     await page.wait_for_timeout(3000)  # Wait 3 seconds after DOM loads
 
                 # Wait for specific selector if provided
                 if selector_to_wait_for:
+                    selector_timeout = selector_timeout or timeout
                     try:
-                        await page.wait_for_selector(selector_to_wait_for, timeout=timeout)
-                        logger.info(f"Found selector: {selector_to_wait_for}")
+                        with latency_tracker.measure(
+                            url,
+                            self.name.value,
+                            "selector",
+                            selector_timeout,
+                            selector_to_wait_for,
+                        ):
+                            await page.wait_for_selector(
+                                selector_to_wait_for, timeout=selector_timeout
+                            )
+                        logger.info("Found selector: %s", selector_to_wait_for)
                     except Exception as e:
-                        logger.warning(f"Selector {selector_to_wait_for} not found: {e}")
+                        logger.warning(
+                            "Selector %s not found: %s", selector_to_wait_for, e
+                        )
 
                 # Simulate human behavior
-                await self._simulate_human_behavior(page)
-
-                # Get final content
-                content = await page.content()
-                cookies_list = await page.context.cookies()
-                cookies_dict = {cookie['name']: cookie['value'] for cookie in cookies_list}
-                
-                logger.info(f"Retrieved {len(content)} chars from {url}. Cookies: {len(cookies_dict)}")
+                if human_behavior:
+                    await human_behavior.run(page, viewport)
 
-                return content, cookies_dict
+                return await self._collect(page, network_capture, url)
 
             finally:
                 #  optionally close the page
                 if page:
                     await page.close()
 
-    async def _simulate_human_behavior(self, page: Page) -> None:
-        """Simulate human-like behavior"""
-        try:
-            # Random delay before interacting
-            await page.wait_for_timeout(random.randint(1000, 3000))
-
-            # Random mouse movement
-            await page.mouse.move(random.randint(100, 800), random.randint(100, 600))
-
-            # Random scroll
-            if random.random() < 0.7:
-                await page.mouse.wheel(0, random.randint(-200, 200))
-                await page.wait_for_timeout(random.randint(500, 1500))
+    async def _collect(
+        self, page: Page, network_capture: Optional[NetworkCapture], url: str
+    ) -> Tuple[str, Dict[str, str], List[CapturedResponse]]:
+        """Read final content, cookies and captured responses from the page"""
+        captured: List[CapturedResponse] = []
+        if network_capture:
+            network_capture.detach(page)
+            captured = await network_capture.drain()
+
+        content = await page.content()
+        cookies_list = await page.context.cookies()
+        cookies_dict = {cookie['name']: cookie['value'] for cookie in cookies_list}
+
+        logger.info(
+            "Retrieved %s chars from %s. Cookies: %s. Captured responses: %s",
+            len(content),
+            url,
+            len(cookies_dict),
+            len(captured),
+        )
 
-        except Exception as e:
-            logger.warning(f"Human behavior simulation failed: {e}")
+        return content, cookies_dict, captured
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import logging
+from fnmatch import fnmatch
+from typing import Dict, List, Optional
+
+from playwright.async_api import Page, Response  # type: ignore[import-not-found]
+
+from app.models import CaptureConfig, CapturedResponse
+
+logger = logging.getLogger(__name__)
+
+
+class NetworkCapture:
+    """Record network responses matching a CaptureConfig on a Playwright page"""
+
+    def __init__(self, config: CaptureConfig) -> None:
+        self.config = config
+        self.responses: List[CapturedResponse] = []
+        self._matched_patterns: Dict[str, int] = {
+            pattern: 0 for pattern in config.url_patterns
+        }
+        self._pending: set = set()
+        self._complete = asyncio.Event()
+
+    def attach(self, page: Page) -> None:
+        """Start listening for responses on the page"""
+        page.on("response", self._on_response)
+
+    def detach(self, page: Page) -> None:
+        """Stop listening for responses on the page"""
+        page.remove_listener("response", self._on_response)
+
+    @property
+    def complete(self) -> bool:
+        """True once every declared pattern has matched at least one response"""
+        return self._complete.is_set()
+
+    def _match_pattern(self, url: str) -> Optional[str]:
+        for pattern in self.config.url_patterns:
+            if fnmatch(url, pattern):
+                return pattern
+        return None
+
+    def _match_content_type(self, content_type: Optional[str]) -> bool:
+        if not self.config.content_types:
+            return True
+        if not content_type:
+            return False
+        content_type = content_type.lower()
+        return any(
+            content_type.startswith(expected.lower())
+            for expected in self.config.content_types
+        )
+
+    def _on_response(self, response: Response) -> None:
+        if len(self.responses) + len(self._pending) >= self.config.max_responses:
+            return
+
+        pattern = self._match_pattern(response.url)
+        if pattern is None:
+            return
+
+        content_type = response.headers.get("content-type")
+        if not self._match_content_type(content_type):
+            return
+
+        # Body retrieval is async; keep a handle so pending reads can be awaited
+        task = asyncio.ensure_future(self._record(response, pattern, content_type))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _record(
+        self, response: Response, pattern: str, content_type: Optional[str]
+    ) -> None:
+        try:
+            raw = await response.body()
+        except Exception as e:
+            # Redirects and aborted requests have no body
+            logger.debug("Could not read body for %s: %s", response.url, e)
+            return
+
+        body = raw.decode("utf-8", errors="replace")
+        data = None
+        if content_type and "json" in content_type.lower():
+            try:
+                data = json.loads(body)
+            except ValueError:
+                pass
+
+        self.responses.append(
+            CapturedResponse(
+                url=response.url,
+                status=response.status,
+                content_type=content_type,
+                pattern=pattern,
+                body=None if data is not None else body,
+                data=data,
+            )
+        )
+        self._matched_patterns[pattern] += 1
+        logger.info("Captured response from %s (%s bytes)", response.url, len(raw))
+
+        if all(count > 0 for count in self._matched_patterns.values()):
+            self._complete.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait (in ms) until every pattern has matched; return whether it did"""
+        try:
+            await asyncio.wait_for(self._complete.wait(), timeout=timeout / 1000)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Capture incomplete after %sms: %s not seen",
+                timeout,
+                [p for p, c in self._matched_patterns.items() if c == 0],
+            )
+            return False
+
+    async def drain(self) -> List[CapturedResponse]:
+        """Wait for in-flight body reads and return the captured responses"""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        return self.responses
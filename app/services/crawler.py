@@ -0,0 +1,308 @@
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from html.parser import HTMLParser
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple, Union
+from urllib.parse import urldefrag, urljoin, urlsplit, urlunsplit
+
+from app.config import settings
+from app.domains import registrable_domain
+from app.models import CrawlPageResult, CrawlRequest, CrawlSummary, ScrapeResponse
+from app.services.factory import ScraperFactory
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> Optional[str]:
+    """Canonical form used for de-duplication; None for non-HTTP URLs"""
+    url, _ = urldefrag(url.strip())
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    try:
+        port = parts.port
+    except ValueError:
+        return None
+    netloc = host if port in (None, _DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+class BloomFilter:
+    """Fixed-size probabilistic set for URL de-duplication
+
+    Uses double hashing over one blake2b digest, so each lookup costs a single
+    hash regardless of the number of probes.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def add(self, item: str) -> bool:
+        """Add an item; return True if it was (probably) not present before"""
+        added = False
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        return added
+
+
+class DiskFrontier:
+    """FIFO of (url, depth) pending crawl, kept in SQLite so large crawls stay off-heap"""
+
+    def __init__(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS frontier ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL, depth INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _push(self, entries: List[Tuple[str, int]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO frontier (url, depth) VALUES (?, ?)", entries
+            )
+            self._conn.commit()
+
+    def _pop(self, limit: int) -> List[Tuple[str, int]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, url, depth FROM frontier ORDER BY id LIMIT ?", (limit,)
+            ).fetchall()
+            if rows:
+                self._conn.execute(
+                    "DELETE FROM frontier WHERE id <= ?", (rows[-1][0],)
+                )
+                self._conn.commit()
+        return [(url, depth) for _, url, depth in rows]
+
+    def _count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM frontier").fetchone()[0]
+
+    async def push(self, entries: List[Tuple[str, int]]) -> None:
+        if entries:
+            await asyncio.to_thread(self._push, entries)
+
+    async def pop(self, limit: int) -> List[Tuple[str, int]]:
+        return await asyncio.to_thread(self._pop, limit)
+
+    async def count(self) -> int:
+        return await asyncio.to_thread(self._count)
+
+    def close(self, delete: bool = True) -> None:
+        self._conn.close()
+        if delete:
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(self.path + suffix)
+                except OSError:
+                    pass
+
+
+class LinkExtractor(HTMLParser):
+    """Collect absolute link targets from <a href>, honoring <base href>"""
+
+    def __init__(self, base_url: str) -> None:
+        super().__init__()
+        self.base_url = base_url
+        self.links: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "base":
+            href = dict(attrs).get("href")
+            if href:
+                self.base_url = urljoin(self.base_url, href)
+        elif tag == "a":
+            attr_map = dict(attrs)
+            href = attr_map.get("href")
+            rel = (attr_map.get("rel") or "").lower()
+            if href and "nofollow" not in rel:
+                self.links.append(urljoin(self.base_url, href.strip()))
+
+
+def extract_links(html: str, base_url: str) -> List[str]:
+    extractor = LinkExtractor(base_url)
+    extractor.feed(html)
+    extractor.close()
+    return extractor.links
+
+
+class Crawler:
+    """Breadth-first crawl job scheduled through the existing scrapers"""
+
+    def __init__(self, request: CrawlRequest) -> None:
+        self.request = request
+        self.job_id = uuid.uuid4().hex
+        # Opened by run(), so a job that never starts streaming leaves no file
+        self.frontier: Optional[DiskFrontier] = None
+        self.seen = BloomFilter(settings.CRAWL_BLOOM_CAPACITY, settings.CRAWL_BLOOM_ERROR_RATE)
+        self.include = [re.compile(p) for p in request.include_patterns]
+        self.exclude = [re.compile(p) for p in request.exclude_patterns]
+        self.allowed_sites: Set[str] = set()
+        # Per-site session state carried from page to page, keyed by registrable domain
+        self.domain_cookies: Dict[str, Dict[str, str]] = {}
+        self.domain_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.urls_discovered = 0
+
+    @staticmethod
+    def _site(url: str) -> str:
+        return registrable_domain(urlsplit(url).hostname or "")
+
+    def _allowed(self, url: str) -> bool:
+        # Subdomains count as the same site, so www.example.com follows example.com
+        if self.request.same_domain and self._site(url) not in self.allowed_sites:
+            return False
+        if self.include and not any(p.search(url) for p in self.include):
+            return False
+        if any(p.search(url) for p in self.exclude):
+            return False
+        return True
+
+    async def _enqueue(self, urls: Iterable[str], depth: int) -> int:
+        entries = []
+        for raw_url in urls:
+            url = normalize_url(raw_url)
+            if url is None or not self._allowed(url):
+                continue
+            if self.seen.add(url):
+                entries.append((url, depth))
+        self.urls_discovered += len(entries)
+        await self.frontier.push(entries)
+        return len(entries)
+
+    async def _fetch(self, url: str, depth: int) -> Tuple[CrawlPageResult, List[str]]:
+        site = self._site(url)
+        semaphore = self.domain_semaphores.setdefault(
+            site, asyncio.Semaphore(settings.CRAWL_PER_DOMAIN_CONCURRENCY)
+        )
+        request = self.request
+        cookies = {**(request.cookies or {}), **self.domain_cookies.get(site, {})}
+
+        async with semaphore:
+            scraper = ScraperFactory.get_scraper(request.scraper_type)
+            result: ScrapeResponse = await scraper.scrape(
+                url=url,
+                selector_to_wait_for=request.selector_to_wait_for,
+                timeout=request.timeout,
+                headless=request.headless,
+                proxy_url=request.proxy_url,
+                proxy_username=request.proxy_username,
+                proxy_password=request.proxy_password,
+                proxy_server=request.proxy_server,
+                wait_until=request.wait_until,
+                cookies=cookies or None,
+                headers=request.headers,
+                human_profile=request.human_profile,
+                human_budget_ms=settings.HUMAN_BEHAVIOR_BUDGET_MS,
+            )
+
+        links: List[str] = []
+        if result.success:
+            if result.cookies:
+                self.domain_cookies.setdefault(site, {}).update(result.cookies)
+            if result.html and depth < request.max_depth:
+                links = await asyncio.to_thread(extract_links, result.html, url)
+
+        page = CrawlPageResult(
+            url=url,
+            depth=depth,
+            success=result.success,
+            error=result.error,
+            html=result.html if request.include_html else None,
+            content_length=result.content_length,
+            links_found=len(links),
+            execution_time=result.execution_time,
+            scraper_used=result.scraper_used,
+        )
+        return page, links
+
+    async def run(self) -> AsyncIterator[Union[CrawlPageResult, CrawlSummary]]:
+        """Yield each page as it completes, then a summary"""
+        start_time = time.time()
+        pages_crawled = pages_failed = scheduled = 0
+        in_flight: Set[asyncio.Task] = set()
+
+        seeds = [normalize_url(str(seed)) for seed in self.request.seeds]
+        self.allowed_sites = {self._site(s) for s in seeds if s}
+        self.frontier = DiskFrontier(
+            os.path.join(settings.CRAWL_DIR, f"{self.job_id}.sqlite")
+        )
+
+        try:
+            await self._enqueue([s for s in seeds if s], depth=0)
+            while True:
+                room = min(
+                    self.request.concurrency - len(in_flight),
+                    self.request.max_pages - scheduled,
+                )
+                if room > 0:
+                    for url, depth in await self.frontier.pop(room):
+                        in_flight.add(asyncio.create_task(self._fetch(url, depth)))
+                        scheduled += 1
+                if not in_flight:
+                    break
+
+                done, in_flight = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    try:
+                        page, links = task.result()
+                    except Exception as e:
+                        logger.error("Crawl fetch failed in job %s: %s", self.job_id, e)
+                        pages_failed += 1
+                        continue
+                    if page.success:
+                        pages_crawled += 1
+                    else:
+                        pages_failed += 1
+                    if links:
+                        page.links_queued = await self._enqueue(links, page.depth + 1)
+                    yield page
+
+            yield CrawlSummary(
+                job_id=self.job_id,
+                pages_crawled=pages_crawled,
+                pages_failed=pages_failed,
+                urls_discovered=self.urls_discovered,
+                frontier_remaining=await self.frontier.count(),
+                execution_time=time.time() - start_time,
+            )
+        finally:
+            # The client may disconnect mid-stream; don't leave scrapes running
+            for task in in_flight:
+                task.cancel()
+            self.frontier.close()
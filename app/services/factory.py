@@ -1,8 +1,12 @@
 from typing import Dict
+from app.services.auto_scraper import AutoScraper
 from app.services.base import BaseScraper
 from app.services.brightdata import BrightDataCDPScraper
 from app.models import ScraperType
 from app.services.camoufox_scraper import CamoufoxScraper
+from app.services.http_scraper import HttpScraper
+from app.services.resource_cache import resource_cache
+from app.services.timeouts import latency_tracker
 
 
 class ScraperFactory:
@@ -17,13 +21,26 @@ class ScraperFactory:
         if cls._initialized:
             return
 
+        if resource_cache:
+            await resource_cache.load()
+        await latency_tracker.load()
+        latency_tracker.start()
+
         # Initialize BrightData scraper
         brightdata_scraper = BrightDataCDPScraper()
         camoufox_scraper = CamoufoxScraper()
+        http_scraper = HttpScraper()
         await brightdata_scraper.initialize()
         await camoufox_scraper.initialize()
+        await http_scraper.initialize()
         cls._scrapers[ScraperType.BRIGHTDATA_CDP] = brightdata_scraper
         cls._scrapers[ScraperType.CAMOUFOX] = camoufox_scraper
+        cls._scrapers[ScraperType.HTTP] = http_scraper
+
+        # Auto escalates through the tiers registered above
+        auto_scraper = AutoScraper(cls._scrapers)
+        await auto_scraper.initialize()
+        cls._scrapers[ScraperType.AUTO] = auto_scraper
 
         # Add future scrapers here
         # selenium_scraper = SeleniumScraper()
@@ -38,6 +55,9 @@ class ScraperFactory:
         for scraper in cls._scrapers.values():
             await scraper.cleanup()
         cls._scrapers.clear()
+        if resource_cache:
+            await resource_cache.save()
+        await latency_tracker.stop()
         cls._initialized = False
 
     @classmethod
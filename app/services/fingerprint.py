@@ -0,0 +1,262 @@
+import asyncio
+import difflib
+import hashlib
+import re
+from collections import OrderedDict
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+from app.config import settings
+from app.models import ScrapeResponse
+
+FINGERPRINT_VERSION = "v1"
+
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+_VOLATILE_BLOCK_RE = re.compile(
+    r"<(script|style|noscript|template)\b.*?</\1\s*>|<!--.*?-->", re.I | re.S
+)
+# Attributes that change on every load without the content changing
+_VOLATILE_ATTR_RE = re.compile(
+    r"""\s(?:nonce|integrity|data-csrf[\w-]*|csrf[\w-]*|data-reactid|data-timestamp)"""
+    r"""\s*=\s*(?:"[^"]*"|'[^']*'|[^\s>]+)""",
+    re.I,
+)
+_CSRF_INPUT_RE = re.compile(
+    r"""<input\b[^>]*name\s*=\s*["']?[\w-]*(?:csrf|token)[\w-]*[^>]*>""", re.I
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+_TAG_BOUNDARY_RE = re.compile(r">\s*<")
+
+# A compound selector: optional tag, then any mix of #id, .class, [attr] / [attr=value]
+_COMPOUND_RE = re.compile(r"^([a-zA-Z][\w-]*|\*)?((?:#[\w-]+|\.[\w-]+|\[[^\]]+\])*)$")
+_PART_RE = re.compile(r"#([\w-]+)|\.([\w-]+)|\[\s*([\w-]+)\s*(?:=\s*[\"']?([^\"'\]]*)[\"']?)?\s*\]")
+
+
+def normalize_html(html: str) -> str:
+    """Reduce HTML to a stable form: one tag or text run per line"""
+    html = _VOLATILE_BLOCK_RE.sub("", html)
+    html = _CSRF_INPUT_RE.sub("", html)
+    html = _VOLATILE_ATTR_RE.sub("", html)
+    html = _WHITESPACE_RE.sub(" ", html).strip()
+    return _TAG_BOUNDARY_RE.sub(">\n<", html)
+
+
+class _SimpleSelector:
+    """Matches one compound selector against a start tag"""
+
+    def __init__(self, compound: str) -> None:
+        match = _COMPOUND_RE.match(compound)
+        if not match or not compound:
+            raise ValueError(f"Unsupported selector: {compound!r}")
+        tag = match.group(1)
+        self.tag = tag.lower() if tag and tag != "*" else None
+        self.id: Optional[str] = None
+        self.classes: List[str] = []
+        self.attrs: List[Tuple[str, Optional[str]]] = []
+        for id_, class_, attr, value in _PART_RE.findall(match.group(2)):
+            if id_:
+                self.id = id_
+            elif class_:
+                self.classes.append(class_)
+            else:
+                self.attrs.append((attr.lower(), value if value != "" else None))
+
+    def matches(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> bool:
+        if self.tag and tag != self.tag:
+            return False
+        attr_map = {name: value or "" for name, value in attrs}
+        if self.id and attr_map.get("id") != self.id:
+            return False
+        if self.classes:
+            element_classes = set(attr_map.get("class", "").split())
+            if not all(cls in element_classes for cls in self.classes):
+                return False
+        for name, value in self.attrs:
+            if name not in attr_map or (value is not None and attr_map[name] != value):
+                return False
+        return True
+
+
+class _RegionExtractor(HTMLParser):
+    """Collect the markup of elements matching a descendant selector
+
+    Supports the subset of CSS used for region fingerprints: tag, #id,
+    .class and [attr=value] compounds joined by whitespace.
+    """
+
+    def __init__(self, selector: str) -> None:
+        super().__init__(convert_charrefs=False)
+        self.chain = [_SimpleSelector(part) for part in selector.split()]
+        if not self.chain:
+            raise ValueError("Empty selector")
+        # For each open element: index of the next chain step to satisfy below it
+        self.stack: List[Tuple[str, int]] = []
+        self.capture_depth: Optional[int] = None
+        self.parts: List[str] = []
+
+    def _progress(self) -> int:
+        return self.stack[-1][1] if self.stack else 0
+
+    def handle_starttag(self, tag, attrs):
+        if self.capture_depth is not None:
+            self.parts.append(self.get_starttag_text() or "")
+            if tag not in VOID_ELEMENTS:
+                self.stack.append((tag, self._progress()))
+            return
+
+        step = self._progress()
+        if step < len(self.chain) and self.chain[step].matches(tag, attrs):
+            step += 1
+        if step == len(self.chain):
+            self.parts.append(self.get_starttag_text() or "")
+            if tag in VOID_ELEMENTS:
+                return
+            self.capture_depth = len(self.stack)
+            # Allow matching again after this element closes
+            step -= 1
+        if tag not in VOID_ELEMENTS:
+            self.stack.append((tag, step))
+
+    def handle_startendtag(self, tag, attrs):
+        if self.capture_depth is not None:
+            self.parts.append(self.get_starttag_text() or "")
+            return
+        step = self._progress()
+        if step == len(self.chain) - 1 and self.chain[step].matches(tag, attrs):
+            self.parts.append(self.get_starttag_text() or "")
+
+    def handle_endtag(self, tag):
+        # Pop to the nearest matching open tag; tolerate unclosed elements
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index][0] == tag:
+                del self.stack[index:]
+                break
+        else:
+            return
+        if self.capture_depth is not None:
+            self.parts.append(f"</{tag}>")
+            if len(self.stack) <= self.capture_depth:
+                self.capture_depth = None
+                self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self.capture_depth is not None:
+            self.parts.append(data)
+
+    def handle_entityref(self, name):
+        self.handle_data(f"&{name};")
+
+    def handle_charref(self, name):
+        self.handle_data(f"&#{name};")
+
+
+def validate_selector(selector: str) -> None:
+    """Raise ValueError if the selector is outside the supported subset"""
+    _RegionExtractor(selector)
+
+
+def extract_region(html: str, selector: str) -> str:
+    """Return the outer HTML of every element matching the selector"""
+    extractor = _RegionExtractor(selector)
+    extractor.feed(html)
+    extractor.close()
+    return "".join(extractor.parts)
+
+
+def compute_fingerprint(
+    html: str, selector: Optional[str] = None
+) -> Tuple[Optional[str], str]:
+    """Return (fingerprint, normalized content) for a page or a region of it
+
+    The fingerprint is None when the selector matches nothing, so a missing
+    region is never reported as unchanged.
+    """
+    source = extract_region(html, selector) if selector else html
+    normalized = normalize_html(source)
+    if selector and not normalized:
+        return None, normalized
+    digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{FINGERPRINT_VERSION}:{digest}", normalized
+
+
+class FingerprintHistory:
+    """Bounded LRU of normalized content by fingerprint, used to build diffs"""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+
+    def get(self, fingerprint: str) -> Optional[str]:
+        content = self._entries.get(fingerprint)
+        if content is not None:
+            self._entries.move_to_end(fingerprint)
+        return content
+
+    def put(self, fingerprint: str, content: str) -> None:
+        if fingerprint in self._entries:
+            self._entries.move_to_end(fingerprint)
+            return
+        if len(content) > self.max_bytes:
+            return
+        self._entries[fingerprint] = content
+        self.total_bytes += len(content)
+        while self.total_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.total_bytes -= len(evicted)
+
+
+fingerprint_history = FingerprintHistory(settings.FINGERPRINT_HISTORY_MAX_BYTES)
+
+
+def _unified_diff(previous: str, current: str) -> str:
+    return "\n".join(
+        difflib.unified_diff(
+            previous.splitlines(),
+            current.splitlines(),
+            fromfile="previous",
+            tofile="current",
+            lineterm="",
+            n=1,
+        )
+    )
+
+
+async def apply_change_detection(
+    result: ScrapeResponse,
+    selector: Optional[str] = None,
+    if_none_match: Optional[str] = None,
+    return_diff: bool = False,
+) -> ScrapeResponse:
+    """Fingerprint the scraped HTML and trim the response if nothing changed"""
+    if not result.success or result.html is None:
+        return result
+
+    # Hashing and parsing multi-MB pages would stall the event loop
+    fingerprint, normalized = await asyncio.to_thread(
+        compute_fingerprint, result.html, selector
+    )
+    if fingerprint is None:
+        return result
+    result.fingerprint = fingerprint
+    fingerprint_history.put(fingerprint, normalized)
+
+    if if_none_match is None:
+        return result
+
+    if if_none_match == fingerprint:
+        result.unchanged = True
+        result.html = None
+        return result
+
+    result.unchanged = False
+    if return_diff:
+        previous = fingerprint_history.get(if_none_match)
+        if previous is not None:
+            result.diff = await asyncio.to_thread(_unified_diff, previous, normalized)
+            result.html = None
+    return result
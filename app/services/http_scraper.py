@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+from urllib.parse import quote, urlsplit
+
+import httpx  # type: ignore[import-not-found]
+
+from app.config import settings
+from app.models import ScrapeResponse, ScraperType
+from app.services.base import BaseScraper
+from app.services.fingerprint import extract_region
+from app.services.timeouts import latency_tracker
+
+logger = logging.getLogger(__name__)
+
+BROWSER_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36"
+    ),
+    "Accept": (
+        "text/html,application/xhtml+xml,application/xml;q=0.9,"
+        "image/avif,image/webp,image/apng,*/*;q=0.8"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+    "Sec-Ch-Ua": '"Not;A=Brand";v="99", "Google Chrome";v="139", "Chromium";v="139"',
+    "Sec-Ch-Ua-Mobile": "?0",
+    "Sec-Ch-Ua-Platform": '"Windows"',
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-User": "?1",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+CHALLENGE_MARKERS = (
+    "chlgeid",
+    "cf-chl",
+    "__cf_chl",
+    "challenge-platform",
+    "just a moment...",
+    "attention required!",
+    "_incapsula_resource",
+    "px-captcha",
+    "captcha-delivery",
+    "datadome",
+    "g-recaptcha",
+    "h-captcha",
+    "access denied",
+    "request unsuccessful",
+)
+
+JS_SHELL_MARKERS = (
+    "enable javascript",
+    "javascript is required",
+    "javascript is disabled",
+    "you need to enable javascript",
+)
+
+_SCRIPT_STYLE_RE = re.compile(r"<(script|style|noscript)\b.*?</\1\s*>", re.I | re.S)
+_TAG_RE = re.compile(r"<[^>]+>")
+
+# Pages with less visible text than this are treated as client-rendered shells
+MIN_VISIBLE_TEXT = 200
+
+
+def detect_block(
+    status_code: int, content: str, selector: Optional[str] = None
+) -> Optional[str]:
+    """Return why a plain HTTP response needs a real browser, or None if usable"""
+    # 403/429/503 are the usual bot-wall answers; any error is worth escalating
+    if status_code >= 400:
+        return f"HTTP {status_code}"
+
+    # Markers live in the head or a short interstitial, so a prefix is enough
+    head = content[:20000].lower()
+    for marker in CHALLENGE_MARKERS:
+        if marker in head:
+            return f"challenge marker '{marker}'"
+
+    visible_text = _TAG_RE.sub(" ", _SCRIPT_STYLE_RE.sub(" ", content))
+    if len(" ".join(visible_text.split())) < MIN_VISIBLE_TEXT:
+        return "JS-only shell (no visible text)"
+    for marker in JS_SHELL_MARKERS:
+        if marker in head:
+            return f"JS-only shell ('{marker}')"
+
+    # A client-rendered page can have plenty of nav/footer text yet lack the
+    # element the caller is waiting for
+    if selector:
+        try:
+            if not extract_region(content, selector):
+                return f"selector '{selector}' not in static HTML"
+        except ValueError:
+            return f"selector '{selector}' can only be checked in a browser"
+
+    return None
+
+
+class HttpScraper(BaseScraper):
+    """Plain HTTP/2 client used as the cheap first tier before a browser"""
+
+    def __init__(self) -> None:
+        # One pooled client per proxy, least recently used first
+        self._clients: "OrderedDict[Optional[str], httpx.AsyncClient]" = OrderedDict()
+        self._leases: Dict[httpx.AsyncClient, int] = {}
+        # Evicted clients still serving a request; closed when it finishes
+        self._retired: Set[httpx.AsyncClient] = set()
+
+    @property
+    def name(self) -> ScraperType:
+        return ScraperType.HTTP
+
+    async def initialize(self) -> None:
+        self._clients[None] = self._create_client()
+        logger.info("HTTP scraper initialized")
+
+    async def cleanup(self) -> None:
+        """Close pooled HTTP clients"""
+        for client in [*self._clients.values(), *self._retired]:
+            await client.aclose()
+        self._clients.clear()
+        self._retired.clear()
+        self._leases.clear()
+        logger.info("HTTP scraper cleaned up")
+
+    def _create_client(self, proxy: Optional[str] = None) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=True,
+            headers=BROWSER_HEADERS,
+            # Clients are shared by every caller, so they must never keep
+            # cookies; each request follows redirects with its own jar
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+            follow_redirects=False,
+            proxy=proxy,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=30.0,
+            ),
+        )
+
+    @asynccontextmanager
+    async def _lease_client(self, proxy: Optional[str]) -> AsyncIterator[httpx.AsyncClient]:
+        # httpx binds proxies per client, so keep one pooled client per proxy
+        client = self._clients.get(proxy)
+        if client is None:
+            client = self._create_client(proxy)
+            self._clients[proxy] = client
+        self._clients.move_to_end(proxy)
+        self._leases[client] = self._leases.get(client, 0) + 1
+        await self._evict_clients()
+        try:
+            yield client
+        finally:
+            self._leases[client] -= 1
+            if not self._leases[client]:
+                del self._leases[client]
+                if client in self._retired:
+                    self._retired.discard(client)
+                    await client.aclose()
+
+    async def _evict_clients(self) -> None:
+        while len(self._clients) > settings.HTTP_MAX_PROXY_CLIENTS:
+            _, client = self._clients.popitem(last=False)
+            if client in self._leases:
+                self._retired.add(client)
+            else:
+                await client.aclose()
+
+    @staticmethod
+    async def _fetch(
+        client: httpx.AsyncClient,
+        url: str,
+        headers: Dict[str, str],
+        cookies: Dict[str, str],
+        timeout: float,
+    ) -> Tuple[httpx.Response, httpx.Cookies]:
+        """GET a URL, following redirects with a cookie jar private to this call"""
+        jar = httpx.Cookies()
+        host = urlsplit(url).hostname or ""
+        for name, value in cookies.items():
+            jar.set(name, value, domain=host)
+
+        request = client.build_request("GET", url, headers=headers, timeout=timeout)
+        history = []
+        while True:
+            jar.set_cookie_header(request)
+            response = await client.send(request)
+            jar.extract_cookies(response)
+            if response.next_request is None:
+                response.history = history
+                return response, jar
+            history.append(response)
+            if len(history) > client.max_redirects:
+                raise httpx.TooManyRedirects(
+                    "Exceeded maximum allowed redirects.", request=request
+                )
+            request = response.next_request
+
+    @staticmethod
+    def _build_proxy(
+        proxy_url: Optional[str],
+        proxy_username: Optional[str],
+        proxy_password: Optional[str],
+        proxy_server: Optional[str],
+    ) -> Optional[str]:
+        server = proxy_url or proxy_server
+        if not server:
+            return None
+        if "://" not in server:
+            server = f"http://{server}"
+        if proxy_username and proxy_password and "@" not in server:
+            scheme, rest = server.split("://", 1)
+            credentials = f"{quote(proxy_username, safe='')}:{quote(proxy_password, safe='')}"
+            server = f"{scheme}://{credentials}@{rest}"
+        return server
+
+    async def scrape(
+        self,
+        url: str,
+        selector_to_wait_for: Optional[str] = None,
+        timeout: Optional[int] = None,
+        headless: bool = True,
+        proxy_url: Optional[str] = None,
+        proxy_username: Optional[str] = None,
+        proxy_password: Optional[str] = None,
+        proxy_server: Optional[str] = None,
+        cookies: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs,
+    ) -> ScrapeResponse:
+        start_time = time.time()
+        proxy = self._build_proxy(proxy_url, proxy_username, proxy_password, proxy_server)
+
+        timeout = latency_tracker.resolve(timeout, url, self.name.value, "navigation")
+
+        try:
+            async with self._lease_client(proxy) as client:
+                with latency_tracker.measure(url, self.name.value, "navigation", timeout):
+                    response, jar = await self._fetch(
+                        client, url, dict(headers or {}), cookies or {}, timeout / 1000
+                    )
+            content = response.text
+        except Exception as e:
+            logger.warning("HTTP fetch failed for %s: %s", url, e)
+            return ScrapeResponse(
+                success=False,
+                error=str(e),
+                execution_time=time.time() - start_time,
+                scraper_used=self.name,
+                retries_attempted=0,
+            )
+
+        execution_time = time.time() - start_time
+        block_reason = await asyncio.to_thread(
+            detect_block, response.status_code, content, selector_to_wait_for
+        )
+        if block_reason:
+            logger.info("HTTP tier insufficient for %s: %s", url, block_reason)
+            return ScrapeResponse(
+                success=False,
+                error=f"Blocked: {block_reason}",
+                content_length=len(content),
+                execution_time=execution_time,
+                scraper_used=self.name,
+                retries_attempted=0,
+            )
+
+        # Includes the caller's cookies and any set along the redirect chain
+        cookies_dict = {cookie.name: cookie.value for cookie in jar.jar}
+
+        logger.info(
+            "✅ HTTP tier fetched %s chars from %s (%s) in %.2fs",
+            len(content),
+            url,
+            response.http_version,
+            execution_time,
+        )
+        return ScrapeResponse(
+            success=True,
+            html=content,
+            cookies=cookies_dict,
+            content_length=len(content),
+            execution_time=execution_time,
+            scraper_used=self.name,
+            retries_attempted=0,
+        )
@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np  # type: ignore[import-not-found]
+from playwright.async_api import Page  # type: ignore[import-not-found]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BehaviorProfile:
+    """Tunables for one style of simulated interaction"""
+
+    curves: Tuple[int, int]  # number of Bezier curves per trajectory
+    knots_per_curve: int  # points sampled per curve
+    max_knots: int  # cap on mousemove events per run (one round trip each)
+    speed: Tuple[float, float]  # pixels per second
+    jitter: float  # max perpendicular noise, in pixels
+    pause_probability: float
+    pause_ms: Tuple[float, float]
+    scroll_probability: float
+    settle_ms: Tuple[float, float]  # idle time after the last movement
+
+
+PROFILES: Dict[str, BehaviorProfile] = {
+    "fast": BehaviorProfile(
+        curves=(1, 2),
+        knots_per_curve=2,
+        max_knots=2,
+        speed=(900, 1400),
+        jitter=2.0,
+        pause_probability=0.1,
+        pause_ms=(50, 150),
+        scroll_probability=0.5,
+        settle_ms=(100, 300),
+    ),
+    "natural": BehaviorProfile(
+        curves=(1, 2),
+        knots_per_curve=3,
+        max_knots=3,
+        speed=(300, 700),
+        jitter=4.0,
+        pause_probability=0.3,
+        pause_ms=(200, 800),
+        scroll_probability=0.7,
+        settle_ms=(800, 2500),
+    ),
+    "cautious": BehaviorProfile(
+        curves=(2, 3),
+        knots_per_curve=3,
+        max_knots=6,
+        speed=(200, 450),
+        jitter=6.0,
+        pause_probability=0.5,
+        pause_ms=(400, 1200),
+        scroll_probability=0.9,
+        settle_ms=(1500, 3500),
+    ),
+}
+
+# Cubic Bernstein basis is fixed per knot count, so cache it
+_BASIS_CACHE: Dict[int, np.ndarray] = {}
+
+
+def _bernstein_basis(knots: int) -> np.ndarray:
+    basis = _BASIS_CACHE.get(knots)
+    if basis is None:
+        t = np.linspace(0.0, 1.0, knots + 1)[1:, None]
+        basis = np.hstack(
+            [(1 - t) ** 3, 3 * (1 - t) ** 2 * t, 3 * (1 - t) * t**2, t**3]
+        )
+        _BASIS_CACHE[knots] = basis
+    return basis
+
+
+@dataclass
+class Trajectory:
+    """Precomputed mouse path: one row per dispatched knot"""
+
+    points: np.ndarray  # (n, 2) pixel coordinates
+    delays_ms: np.ndarray  # (n,) idle time after reaching each knot
+    scroll: Optional[int]
+    settle_ms: float
+
+    @property
+    def duration_ms(self) -> float:
+        return float(self.delays_ms.sum() + self.settle_ms)
+
+    def scale_to(self, budget_ms: float) -> None:
+        """Shrink every pause proportionally so the whole run fits the budget"""
+        if budget_ms <= 0:
+            self.delays_ms = np.zeros_like(self.delays_ms)
+            self.settle_ms = 0.0
+        elif self.duration_ms > budget_ms:
+            factor = budget_ms / self.duration_ms
+            self.delays_ms = self.delays_ms * factor
+            self.settle_ms *= factor
+
+
+def plan_trajectory(
+    viewport: Dict[str, int],
+    profile: BehaviorProfile,
+    start: Tuple[float, float] = (400, 300),
+    rng: Optional[np.random.Generator] = None,
+) -> Trajectory:
+    """Compute every Bezier curve of a trajectory in one vectorized pass"""
+    rng = rng or np.random.default_rng()
+    width, height = viewport["width"], viewport["height"]
+    curves = int(rng.integers(profile.curves[0], profile.curves[1] + 1))
+
+    # Waypoints each curve ends at, kept inside the viewport margins
+    max_jump = min(300, width // 3)
+    steps = rng.integers(-max_jump, max_jump + 1, size=(curves, 2))
+    ends = np.clip(
+        np.asarray(start) + np.cumsum(steps, axis=0),
+        [50, 50],
+        [width - 50, height - 50],
+    ).astype(float)
+    starts = np.vstack([np.asarray(start, dtype=float), ends[:-1]])
+
+    # Control points bow away from the straight line by a random fraction of its length
+    direction = ends - starts
+    normal = np.stack([-direction[:, 1], direction[:, 0]], axis=1)
+    bow = rng.uniform(-0.3, 0.3, size=(curves, 2, 1))
+    control_1 = starts + direction * 0.33 + normal * bow[:, 0]
+    control_2 = starts + direction * 0.66 + normal * bow[:, 1]
+    control = np.stack([starts, control_1, control_2, ends], axis=1)  # (curves, 4, 2)
+
+    basis = _bernstein_basis(profile.knots_per_curve)  # (knots, 4)
+    points = np.einsum("kc,ncd->nkd", basis, control)
+    points += rng.uniform(-profile.jitter, profile.jitter, size=points.shape)
+    points = points.reshape(-1, 2)
+    if len(points) > profile.max_knots:
+        # Keep evenly spaced knots along the whole path, always ending at its end
+        keep = np.linspace(0, len(points) - 1, profile.max_knots + 1)[1:]
+        points = points[np.round(keep).astype(int)]
+    points = np.clip(points, [0, 0], [width - 1, height - 1])
+
+    # Time to travel each hop at a per-hop speed, plus occasional hesitation
+    previous = np.vstack([np.asarray(start, dtype=float), points[:-1]])
+    distance = np.linalg.norm(points - previous, axis=1)
+    speed = rng.uniform(profile.speed[0], profile.speed[1], size=len(points))
+    delays_ms = distance / speed * 1000
+    pauses = rng.random(len(points)) < profile.pause_probability
+    delays_ms += pauses * rng.uniform(
+        profile.pause_ms[0], profile.pause_ms[1], size=len(points)
+    )
+
+    scroll = None
+    if rng.random() < profile.scroll_probability:
+        scroll = int(rng.integers(-200, 201))
+
+    return Trajectory(
+        points=np.round(points, 1),
+        delays_ms=delays_ms,
+        scroll=scroll,
+        settle_ms=float(rng.uniform(*profile.settle_ms)),
+    )
+
+
+class HumanBehavior:
+    """Replay a precomputed trajectory on a page within a time budget"""
+
+    def __init__(self, profile: str = "natural", budget_ms: Optional[int] = None):
+        self.profile = PROFILES.get(profile) if profile != "none" else None
+        if profile != "none" and self.profile is None:
+            raise ValueError(f"Unknown human behavior profile: {profile}")
+        self.budget_ms = budget_ms
+
+    async def run(self, page: Page, viewport: Dict[str, int]) -> None:
+        """Simulate human-like mouse movements and scrolling"""
+        if self.profile is None or self.budget_ms == 0:
+            return
+
+        trajectory = plan_trajectory(viewport, self.profile)
+        if self.budget_ms is not None:
+            trajectory.scale_to(self.budget_ms)
+        deadline = (
+            time.monotonic() + self.budget_ms / 1000
+            if self.budget_ms is not None
+            else None
+        )
+
+        try:
+            points: List[List[float]] = trajectory.points.tolist()
+            delays: List[float] = (trajectory.delays_ms / 1000).tolist()
+            for (x, y), delay in zip(points, delays):
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                # One mousemove per knot: steps > 1 makes the driver send one
+                # protocol message per step, each a round trip to the browser
+                await page.mouse.move(x, y, steps=1)
+                # Sleep locally instead of page.wait_for_timeout to save a round trip
+                await asyncio.sleep(delay)
+
+            if trajectory.scroll is not None and (
+                deadline is None or time.monotonic() < deadline
+            ):
+                await page.mouse.wheel(0, trajectory.scroll)
+
+            settle = trajectory.settle_ms / 1000
+            if deadline is not None:
+                settle = min(settle, max(0.0, deadline - time.monotonic()))
+            await asyncio.sleep(settle)
+
+        except Exception as e:
+            logger.warning("Human behavior simulation failed: %s", e)
@@ -0,0 +1,402 @@
+import asyncio
+import email.utils
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from playwright.async_api import Page, Response, Route  # type: ignore[import-not-found]
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CACHEABLE_RESOURCE_TYPES = {"script", "stylesheet", "font", "image"}
+
+# Never replay these from a shared cache; bodies are stored decoded
+_UNCACHED_HEADERS = {
+    "content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie",
+}
+
+# The cache is keyed by URL only, so a response may vary on nothing but the
+# encoding (bodies are stored decoded); Vary: Origin would replay one page's
+# CORS headers to another origin
+_ALLOWED_VARY = {"accept-encoding"}
+
+_MAX_AGE_RE = re.compile(r"(?:^|,)\s*(s-maxage|max-age)\s*=\s*(\d+)", re.I)
+
+
+class DomainBlocklist:
+    """Suffix matcher: blocking example.com also blocks any subdomain of it"""
+
+    def __init__(self, domains: Iterable[str]) -> None:
+        self._domains = {d.strip().lower().strip(".") for d in domains if d.strip()}
+
+    def is_blocked(self, host: Optional[str]) -> bool:
+        if not host or not self._domains:
+            return False
+        labels = host.lower().rstrip(".").split(".")
+        # One set lookup per label suffix, so cost is independent of list size
+        for i in range(len(labels) - 1):
+            if ".".join(labels[i:]) in self._domains:
+                return True
+        return False
+
+    def url_patterns(self) -> List[str]:
+        """Wildcard patterns for CDP's Network.setBlockedURLs"""
+        patterns = []
+        for domain in sorted(self._domains):
+            patterns += [f"*://{domain}/*", f"*://*.{domain}/*"]
+        return patterns
+
+
+@dataclass
+class CacheEntry:
+    digest: str
+    status: int
+    headers: Dict[str, str]
+    expires_at: float
+    size: int
+
+
+def freshness_lifetime(headers: Dict[str, str]) -> Optional[float]:
+    """Seconds a response may still be reused for, or None if it must not be cached
+
+    The lifetime left is the server's freshness lifetime minus the `Age` an
+    upstream cache (usually a CDN) already held it for.
+    """
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return None
+    if "private" in cache_control:
+        # Ours is a shared cache
+        return None
+
+    directives = dict((k.lower(), int(v)) for k, v in _MAX_AGE_RE.findall(cache_control))
+    if "s-maxage" in directives:
+        lifetime = float(directives["s-maxage"])
+    elif "max-age" in directives:
+        lifetime = float(directives["max-age"])
+    elif headers.get("expires"):
+        try:
+            expires_at = email.utils.parsedate_to_datetime(headers["expires"]).timestamp()
+        except (TypeError, ValueError):
+            return None
+        date = headers.get("date")
+        try:
+            now = email.utils.parsedate_to_datetime(date).timestamp() if date else time.time()
+        except (TypeError, ValueError):
+            now = time.time()
+        lifetime = expires_at - now
+    else:
+        return None
+
+    try:
+        age = max(0, int(headers.get("age", "0").strip()))
+    except ValueError:
+        age = 0
+    lifetime -= age
+    return lifetime if lifetime > 0 else None
+
+
+class ResourceCache:
+    """Content-addressed on-disk cache of subresources shared by all browsers
+
+    Bodies are stored once per SHA-256 digest; an in-memory LRU index maps
+    URLs to digests and is persisted next to the blobs.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._blob_refs: Dict[str, int] = {}
+        self._blob_sizes: Dict[str, int] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, "index.json")
+
+    def is_fresh(self, url: str) -> bool:
+        entry = self._index.get(url)
+        return entry is not None and entry.expires_at > time.time()
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest)
+
+    async def load(self) -> None:
+        """Load the persisted index, dropping entries whose blob is gone
+
+        Blobs the index doesn't reference (written after the last save, e.g.
+        before an unclean shutdown) would never be evicted, so they are removed.
+        """
+        entries = await asyncio.to_thread(self._read_index)
+        now = time.time()
+        for url, entry in entries.items():
+            if entry.expires_at > now:
+                self._add(url, entry)
+        swept = await asyncio.to_thread(self._sweep_unreferenced, set(self._blob_refs))
+        logger.info(
+            "Resource cache loaded: %s entries, %s bytes, %s unreferenced blobs removed",
+            len(self._index),
+            self.total_bytes,
+            swept,
+        )
+
+    def _sweep_unreferenced(self, referenced: Set[str]) -> int:
+        swept = 0
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for blob in os.scandir(shard.path):
+                if blob.name not in referenced:
+                    try:
+                        os.remove(blob.path)
+                        swept += 1
+                    except OSError:
+                        pass
+        return swept
+
+    def _read_index(self) -> Dict[str, CacheEntry]:
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        entries = {}
+        for url, data in raw.items():
+            entry = CacheEntry(**data)
+            if os.path.exists(self._blob_path(entry.digest)):
+                entries[url] = entry
+        return entries
+
+    async def save(self) -> None:
+        """Persist the index so the cache survives restarts"""
+        snapshot = {url: asdict(entry) for url, entry in self._index.items()}
+        await asyncio.to_thread(self._write_json, self._index_path, snapshot)
+
+    @staticmethod
+    def _write_json(path: str, data: dict) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def _add(self, url: str, entry: CacheEntry) -> None:
+        self._remove(url)
+        self._index[url] = entry
+        refs = self._blob_refs.get(entry.digest, 0)
+        if refs == 0:
+            self._blob_sizes[entry.digest] = entry.size
+            self.total_bytes += entry.size
+        self._blob_refs[entry.digest] = refs + 1
+
+    def _remove(self, url: str) -> Optional[str]:
+        """Drop a URL; return its digest if no other URL references the blob"""
+        entry = self._index.pop(url, None)
+        if entry is None:
+            return None
+        refs = self._blob_refs[entry.digest] - 1
+        if refs > 0:
+            self._blob_refs[entry.digest] = refs
+            return None
+        del self._blob_refs[entry.digest]
+        self.total_bytes -= self._blob_sizes.pop(entry.digest)
+        return entry.digest
+
+    async def get(self, url: str) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """Return (status, headers, body) for a fresh cached URL"""
+        entry = self._index.get(url)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.time():
+            orphan = self._remove(url)
+            if orphan:
+                await asyncio.to_thread(self._delete_blob, orphan)
+            self.misses += 1
+            return None
+
+        try:
+            body = await asyncio.to_thread(self._read_blob, entry.digest)
+        except OSError:
+            self._remove(url)
+            self.misses += 1
+            return None
+
+        self._index.move_to_end(url)
+        self.hits += 1
+        return entry.status, entry.headers, body
+
+    async def put(
+        self, url: str, status: int, headers: Dict[str, str], body: bytes
+    ) -> bool:
+        """Store a response if its headers allow it; return whether it was stored"""
+        if status != 200 or len(body) > self.max_bytes // 10:
+            return False
+        headers = {k.lower(): v for k, v in headers.items()}
+        vary = headers.get("vary", "").lower().replace(" ", "")
+        if vary and not set(vary.split(",")) <= _ALLOWED_VARY:
+            return False
+        # Some servers echo the request's Origin without declaring Vary: Origin
+        if headers.get("access-control-allow-origin", "*").strip() != "*":
+            return False
+        lifetime = freshness_lifetime(headers)
+        if lifetime is None:
+            return False
+
+        digest = hashlib.sha256(body).hexdigest()
+        if digest not in self._blob_refs:
+            await asyncio.to_thread(self._write_blob, digest, body)
+
+        self._add(
+            url,
+            CacheEntry(
+                digest=digest,
+                status=status,
+                headers={k: v for k, v in headers.items() if k not in _UNCACHED_HEADERS},
+                expires_at=time.time() + lifetime,
+                size=len(body),
+            ),
+        )
+        await self._evict()
+        return True
+
+    async def _evict(self) -> None:
+        orphans = []
+        while self.total_bytes > self.max_bytes and self._index:
+            oldest_url = next(iter(self._index))
+            orphan = self._remove(oldest_url)
+            if orphan:
+                orphans.append(orphan)
+        if orphans:
+            await asyncio.to_thread(self._delete_blobs, orphans)
+
+    def _read_blob(self, digest: str) -> bytes:
+        with open(self._blob_path(digest), "rb") as f:
+            return f.read()
+
+    def _write_blob(self, digest: str, body: bytes) -> None:
+        path = self._blob_path(digest)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique temp name: two pages may fetch the same asset concurrently
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    def _delete_blob(self, digest: str) -> None:
+        try:
+            os.remove(self._blob_path(digest))
+        except OSError:
+            pass
+
+    def _delete_blobs(self, digests: Iterable[str]) -> None:
+        for digest in digests:
+            self._delete_blob(digest)
+
+
+class ResourceRouter:
+    """Block trackers and serve cached assets from disk
+
+    Only cache hits are answered locally. Misses go out through the browser's
+    own network stack (its TLS fingerprint, the proxy or BrightData's exit), and
+    cacheable responses are stored as the browser receives them.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[ResourceCache],
+        blocklist: DomainBlocklist,
+        blocked_resource_types: Iterable[str] = (),
+    ) -> None:
+        self.cache = cache
+        self.blocklist = blocklist
+        self.blocked_resource_types = set(blocked_resource_types)
+
+    async def attach(self, page: Page) -> None:
+        await page.route("**/*", self.handle)
+        if self.cache is not None:
+            page.on("response", self._store_response)
+
+    async def attach_remote(self, page: Page) -> None:
+        """Block listed domains on a remote CDP browser without intercepting
+
+        Routing a remote session adds a round trip to this server for every
+        request, so only the blocklist is applied, inside the browser.
+        """
+        patterns = self.blocklist.url_patterns()
+        if not patterns:
+            return
+        try:
+            cdp = await page.context.new_cdp_session(page)
+            await cdp.send("Network.enable")
+            await cdp.send("Network.setBlockedURLs", {"urls": patterns})
+        except Exception as e:
+            logger.debug("Could not set blocked URLs over CDP: %s", e)
+
+    async def handle(self, route: Route) -> None:
+        request = route.request
+        if request.resource_type in self.blocked_resource_types:
+            await route.abort()
+            return
+        if self.blocklist.is_blocked(urlparse(request.url).hostname):
+            await route.abort("blockedbyclient")
+            return
+
+        if (
+            self.cache is None
+            or request.method != "GET"
+            or request.resource_type not in CACHEABLE_RESOURCE_TYPES
+        ):
+            await route.continue_()
+            return
+
+        cached = await self.cache.get(request.url)
+        if cached:
+            status, headers, body = cached
+            await route.fulfill(status=status, headers=headers, body=body)
+            return
+
+        await route.continue_()
+
+    async def _store_response(self, response: Response) -> None:
+        request = response.request
+        if (
+            request.method != "GET"
+            or request.resource_type not in CACHEABLE_RESOURCE_TYPES
+            or response.status != 200
+            # Also skips responses we fulfilled from the cache ourselves
+            or self.cache.is_fresh(response.url)
+            # Don't pull bodies over the wire that put() would reject anyway
+            or freshness_lifetime({k.lower(): v for k, v in response.headers.items()}) is None
+        ):
+            return
+        try:
+            body = await response.body()
+            await self.cache.put(response.url, response.status, response.headers, body)
+        except Exception as e:
+            # The page may have navigated away or closed before the body was read
+            logger.debug("Could not cache %s: %s", response.url, e)
+
+
+resource_cache: Optional[ResourceCache] = (
+    ResourceCache(settings.RESOURCE_CACHE_DIR, settings.RESOURCE_CACHE_MAX_BYTES)
+    if settings.RESOURCE_CACHE_ENABLED
+    else None
+)
+resource_blocklist = DomainBlocklist(settings.RESOURCE_BLOCKLIST)
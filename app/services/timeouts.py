@@ -0,0 +1,336 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from bisect import insort
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest outcome in the recent timeout rate
+TIMEOUT_RATE_ALPHA = 0.05
+
+
+class P2Quantile:
+    """Streaming quantile estimate in O(1) memory (Jain & Chlamtac's P² algorithm)
+
+    Keeps five markers whose heights track the minimum, p/2, p, (1+p)/2 and
+    maximum quantiles, adjusted with piecewise-parabolic interpolation.
+    """
+
+    def __init__(self, p: float) -> None:
+        self.p = p
+        self.count = 0
+        self.heights: List[float] = []
+        self.positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self.desired = [1.0, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5.0]
+        self.increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        q = self.heights
+        if len(q) < 5:
+            insort(q, x)
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(1, 5) if x < q[i]) - 1
+
+        for i in range(k + 1, 5):
+            self.positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        n = self.positions
+        for i in range(1, 4):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                candidate = q[i] + step / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < candidate < q[i + 1]:
+                    candidate = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                q[i] = candidate
+                n[i] += step
+
+    def value(self) -> Optional[float]:
+        if not self.heights:
+            return None
+        if len(self.heights) < 5:
+            index = min(len(self.heights) - 1, int(self.p * len(self.heights)))
+            return self.heights[index]
+        return self.heights[2]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "p": self.p,
+            "count": self.count,
+            "heights": self.heights,
+            "positions": self.positions,
+            "desired": self.desired,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "P2Quantile":
+        estimator = cls(data["p"])
+        estimator.count = data["count"]
+        estimator.heights = list(data["heights"])
+        estimator.positions = list(data["positions"])
+        estimator.desired = list(data["desired"])
+        return estimator
+
+
+class LatencyStats:
+    """Per-key latency summary: a streaming quantile of successes plus timeouts
+
+    Timed-out waits are censored samples: the true latency is unknown, only that
+    it exceeded the limit. They are counted but kept out of the quantile, since
+    feeding them in would let margin-on-limit ratchet the timeout up to the
+    maximum. Instead an exponentially weighted timeout rate tracks how often the
+    learned limit is too short; once it passes ADAPTIVE_TIMEOUT_MAX_TIMEOUT_RATE
+    the quantile is discarded and relearned, with DEFAULT_TIMEOUT in the meantime.
+    """
+
+    def __init__(self, quantile: float) -> None:
+        self.estimator = P2Quantile(quantile)
+        self.max_ms = 0.0
+        self.timeouts = 0
+        self.timeout_rate = 0.0
+        self.updated_at = 0.0
+
+    def add(self, latency_ms: float) -> None:
+        self.estimator.add(latency_ms)
+        self.max_ms = max(self.max_ms, latency_ms)
+        self.timeout_rate *= 1 - TIMEOUT_RATE_ALPHA
+        self.updated_at = time.time()
+
+    def add_timeout(self) -> bool:
+        """Count a timeout; return True if it made the learned quantile stale"""
+        self.timeouts += 1
+        self.timeout_rate = self.timeout_rate * (1 - TIMEOUT_RATE_ALPHA) + TIMEOUT_RATE_ALPHA
+        self.updated_at = time.time()
+        if self.timeout_rate <= settings.ADAPTIVE_TIMEOUT_MAX_TIMEOUT_RATE:
+            return False
+        stale = self.estimator.count > 0
+        self.estimator = P2Quantile(self.estimator.p)
+        self.timeout_rate = 0.0
+        return stale
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "estimator": self.estimator.to_dict(),
+            "max_ms": self.max_ms,
+            "timeouts": self.timeouts,
+            "timeout_rate": self.timeout_rate,
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyStats":
+        stats = cls(data["estimator"]["p"])
+        stats.estimator = P2Quantile.from_dict(data["estimator"])
+        stats.max_ms = data["max_ms"]
+        stats.timeouts = data.get("timeouts", 0)
+        stats.timeout_rate = data.get("timeout_rate", 0.0)
+        stats.updated_at = data["updated_at"]
+        return stats
+
+
+class LatencyTracker:
+    """Learn navigation and selector latencies per domain and derive timeouts"""
+
+    def __init__(self, state_file: str) -> None:
+        self.state_file = state_file
+        self._stats: Dict[str, LatencyStats] = {}
+        self._dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _key(url: str, scraper: str, kind: str, selector: Optional[str]) -> str:
+        domain = (urlsplit(url).hostname or "").lower()
+        return "|".join([domain, scraper, kind, selector or ""])
+
+    def _stats_for(
+        self, url: str, scraper: str, kind: str, selector: Optional[str]
+    ) -> LatencyStats:
+        key = self._key(url, scraper, kind, selector)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = LatencyStats(settings.ADAPTIVE_TIMEOUT_QUANTILE)
+        self._dirty = True
+        return stats
+
+    def record(
+        self,
+        url: str,
+        scraper: str,
+        kind: str,
+        latency_ms: float,
+        selector: Optional[str] = None,
+    ) -> None:
+        """Record the latency of a wait that succeeded"""
+        self._stats_for(url, scraper, kind, selector).add(latency_ms)
+
+    def record_timeout(
+        self,
+        url: str,
+        scraper: str,
+        kind: str,
+        limit_ms: float,
+        selector: Optional[str] = None,
+    ) -> None:
+        """Record a wait that gave up at `limit_ms` without succeeding"""
+        if self._stats_for(url, scraper, kind, selector).add_timeout():
+            logger.info(
+                "Timeouts at %sms are frequent for %s; relearning latency",
+                limit_ms,
+                self._key(url, scraper, kind, selector),
+            )
+
+    @contextmanager
+    def measure(
+        self,
+        url: str,
+        scraper: str,
+        kind: str,
+        timeout: int,
+        selector: Optional[str] = None,
+    ) -> Iterator[None]:
+        """Time the enclosed wait; a failure at the limit is recorded as a timeout"""
+        start = time.monotonic()
+        try:
+            yield
+        except Exception:
+            if (time.monotonic() - start) * 1000 >= timeout * 0.95:
+                self.record_timeout(url, scraper, kind, timeout, selector)
+            raise
+        self.record(url, scraper, kind, (time.monotonic() - start) * 1000, selector)
+
+    def suggest(
+        self, url: str, scraper: str, kind: str, selector: Optional[str] = None
+    ) -> Optional[int]:
+        """Timeout (ms) from the learned quantile, or None while still learning
+
+        Only successful waits count towards the sample minimum, so a wait that
+        never succeeds keeps the default instead of learning from its own limit,
+        and so does a key relearning after its timeout rate got too high.
+        """
+        stats = self._stats.get(self._key(url, scraper, kind, selector))
+        if stats is None or stats.estimator.count < settings.ADAPTIVE_TIMEOUT_MIN_SAMPLES:
+            return None
+        timeout = (stats.estimator.value() or 0.0) * settings.ADAPTIVE_TIMEOUT_MARGIN
+        return int(
+            min(
+                settings.ADAPTIVE_TIMEOUT_MAX_MS,
+                max(settings.ADAPTIVE_TIMEOUT_MIN_MS, timeout),
+            )
+        )
+
+    def resolve(
+        self,
+        pinned: Optional[int],
+        url: str,
+        scraper: str,
+        kind: str,
+        selector: Optional[str] = None,
+    ) -> int:
+        """Pick the client's timeout if pinned, else a learned one, else the default"""
+        if pinned:
+            return pinned
+        if settings.ADAPTIVE_TIMEOUTS_ENABLED:
+            suggested = self.suggest(url, scraper, kind, selector)
+            if suggested is not None:
+                return suggested
+        return settings.DEFAULT_TIMEOUT
+
+    def snapshot(self, domain: Optional[str] = None) -> List[Dict[str, Any]]:
+        entries = []
+        for key, stats in sorted(self._stats.items()):
+            key_domain, scraper, kind, selector = key.split("|", 3)
+            if domain and key_domain != domain.lower():
+                continue
+            entries.append(
+                {
+                    "domain": key_domain,
+                    "scraper": scraper,
+                    "kind": kind,
+                    "selector": selector or None,
+                    "samples": stats.estimator.count,
+                    "quantile": stats.estimator.p,
+                    "quantile_ms": round(stats.estimator.value() or 0.0, 1),
+                    "max_ms": round(stats.max_ms, 1),
+                    "timeouts": stats.timeouts,
+                    "timeout_rate": round(stats.timeout_rate, 3),
+                    "suggested_timeout_ms": self.suggest(
+                        f"http://{key_domain}", scraper, kind, selector or None
+                    ),
+                    "updated_at": stats.updated_at,
+                }
+            )
+        return entries
+
+    async def load(self) -> None:
+        data = await asyncio.to_thread(self._read_state)
+        self._stats = {key: LatencyStats.from_dict(value) for key, value in data.items()}
+        logger.info("Loaded latency stats for %s keys", len(self._stats))
+
+    def _read_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    async def save(self) -> None:
+        if not self._dirty:
+            return
+        snapshot = {key: stats.to_dict() for key, stats in self._stats.items()}
+        self._dirty = False
+        await asyncio.to_thread(self._write_state, snapshot)
+
+    def _write_state(self, snapshot: Dict[str, Any]) -> None:
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.state_file}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.state_file)
+
+    def start(self) -> None:
+        """Periodically flush learned state so a crash loses little"""
+        self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.save()
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(settings.ADAPTIVE_TIMEOUT_FLUSH_INTERVAL)
+            try:
+                await self.save()
+            except OSError as e:
+                logger.warning("Failed to persist latency stats: %s", e)
+
+
+latency_tracker = LatencyTracker(settings.ADAPTIVE_TIMEOUT_STATE_FILE)
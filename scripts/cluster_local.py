@@ -0,0 +1,126 @@
+"""Run a local multi-process cluster and exercise domain routing and failover
+
+Usage: pdm run cluster-local [--nodes 3] [--base-port 8101] [--keep-running]
+
+Starts one uvicorn process per node on consecutive ports, all with the same
+peer list, then shows which node owns a few domains, stops one node to show
+its domains moving, and restarts it. Node logs go to .cache/cluster/.
+Scrapes use the http tier, so no browser or BrightData endpoint is needed.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+DOMAINS = [
+    "example.com", "www.example.com", "example.org", "wikipedia.org",
+    "en.wikipedia.org", "amazon.de", "bbc.co.uk",
+]
+LOG_DIR = os.path.join(".cache", "cluster")
+
+
+def start_node(port: int, peers: List[str]) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        CLUSTER_ENABLED="true",
+        CLUSTER_PEERS=json.dumps(peers),
+        CLUSTER_SELF=f"http://127.0.0.1:{port}",
+        CLUSTER_HEALTH_INTERVAL="1",
+        CAMOUFOX_FINGERPRINT_POOL_SIZE="0",
+        ADAPTIVE_TIMEOUT_STATE_FILE=os.path.join(LOG_DIR, f"latency_{port}.json"),
+        RESOURCE_CACHE_DIR=os.path.join(LOG_DIR, f"resources_{port}"),
+        CRAWL_DIR=os.path.join(LOG_DIR, f"crawls_{port}"),
+    )
+    # Settings require an endpoint; the http tier never connects to it
+    env.setdefault("BRIGHTDATA_CDP_ENDPOINT", "wss://unused.invalid")
+    log = open(os.path.join(LOG_DIR, f"node_{port}.log"), "w")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+
+
+def wait_healthy(client: httpx.Client, url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if client.get(f"{url}/health").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"{url} did not become healthy; see {LOG_DIR}")
+
+
+def show_routing(client: httpx.Client, entry: str) -> None:
+    for domain in DOMAINS:
+        response = client.post(
+            f"{entry}/scrape",
+            json={"url": f"https://{domain}/", "scraper_type": "http", "timeout": 5000},
+        )
+        node = response.headers.get("X-Cluster-Node", f"{entry} (local)")
+        print(f"  {domain:<18} -> {node:<28} HTTP {response.status_code}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=3)
+    parser.add_argument("--base-port", type=int, default=8101)
+    parser.add_argument(
+        "--keep-running", action="store_true", help="leave the nodes up until Ctrl-C"
+    )
+    args = parser.parse_args()
+
+    os.makedirs(LOG_DIR, exist_ok=True)
+    ports = [args.base_port + i for i in range(args.nodes)]
+    peers = [f"http://127.0.0.1:{port}" for port in ports]
+    headers = {"Authorization": f"Bearer {os.environ.get('API_KEY', 'local')}"}
+    client = httpx.Client(headers=headers, timeout=30, trust_env=False)
+    nodes: Dict[int, subprocess.Popen] = {port: start_node(port, peers) for port in ports}
+
+    try:
+        for peer in peers:
+            wait_healthy(client, peer)
+        # Let every node see the others in at least one health round
+        time.sleep(2)
+        entry, victim = peers[0], ports[-1]
+
+        print(f"Ring shares: {client.get(f'{entry}/cluster').json()['ring_shares']}")
+        print(f"Routing through {entry}:")
+        show_routing(client, entry)
+
+        print(f"Stopping node {victim}; only its domains should move:")
+        nodes[victim].terminate()
+        nodes[victim].wait()
+        time.sleep(3)
+        show_routing(client, entry)
+
+        print(f"Restarting node {victim}:")
+        nodes[victim] = start_node(victim, peers)
+        wait_healthy(client, peers[-1])
+        time.sleep(2)
+        show_routing(client, entry)
+
+        if args.keep_running:
+            print(f"Nodes running on ports {ports}; Ctrl-C to stop")
+            while True:
+                time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for node in nodes.values():
+            node.terminate()
+        for node in nodes.values():
+            node.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+import os
+
+# Settings require an endpoint at import time; tests never connect to it
+os.environ.setdefault("BRIGHTDATA_CDP_ENDPOINT", "wss://brightdata.test")
@@ -0,0 +1,58 @@
+import asyncio
+
+from app.config import settings
+from app.models import ScrapeResponse, ScraperType
+from app.services.auto_scraper import AutoScraper
+
+
+class FakeTier:
+    def __init__(self, tier, success):
+        self.tier = tier
+        self.success = success
+        self.calls = 0
+
+    async def scrape(self, url, **kwargs):
+        self.calls += 1
+        return ScrapeResponse(
+            success=self.success,
+            error=None if self.success else "Blocked: selector '#app' not in static HTML",
+            execution_time=0.01,
+            scraper_used=self.tier,
+            retries_attempted=0,
+        )
+
+
+def _auto():
+    tiers = {
+        ScraperType.HTTP: FakeTier(ScraperType.HTTP, False),
+        ScraperType.CAMOUFOX: FakeTier(ScraperType.CAMOUFOX, True),
+    }
+    return AutoScraper(tiers), tiers
+
+
+def test_escalates_and_remembers_working_tier():
+    auto, tiers = _auto()
+
+    async def scenario():
+        first = await auto.scrape("https://spa.test/", selector_to_wait_for="#app")
+        second = await auto.scrape("https://spa.test/other", selector_to_wait_for="#app")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first.scraper_used == second.scraper_used == ScraperType.CAMOUFOX
+    # The futile HTTP attempt is skipped once the domain is remembered
+    assert tiers[ScraperType.HTTP].calls == 1
+    assert auto.remembered_tier("spa.test") == ScraperType.CAMOUFOX
+
+
+def test_tier_memory_is_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "TIER_MEMORY_MAX_DOMAINS", 3)
+    auto, _ = _auto()
+
+    for i in range(5):
+        auto.remember_tier(f"site{i}.test", ScraperType.HTTP)
+    auto.remembered_tier("site2.test")
+    auto.remember_tier("site5.test", ScraperType.HTTP)
+
+    assert list(auto._tier_memory) == ["site4.test", "site2.test", "site5.test"]
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from app.services.browser_profiles import ExitIpCache
+
+PROXY = {"server": "http://proxy.test:8000", "username": "user-session-1", "password": "x"}
+
+
+class CountingCache(ExitIpCache):
+    def __init__(self, result, ttl=3600, failure_ttl=60):
+        super().__init__(ttl, failure_ttl)
+        self.result = result
+        self.lookups = 0
+
+    async def _lookup(self, proxy):
+        self.lookups += 1
+        await asyncio.sleep(0.01)
+        return self.result
+
+
+def test_concurrent_launches_share_one_lookup():
+    cache = CountingCache("203.0.113.7")
+
+    async def scenario():
+        return await asyncio.gather(*(cache.resolve(PROXY) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["203.0.113.7"] * 5
+    assert cache.lookups == 1
+    assert cache._pending == {}
+
+
+def test_failed_lookup_is_cached_for_failure_ttl():
+    cache = CountingCache(None)
+
+    async def scenario():
+        return [await cache.resolve(PROXY) for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [None] * 3
+    assert cache.lookups == 1
+
+
+@pytest.mark.parametrize("result", ["203.0.113.7", None])
+def test_expired_entries_are_looked_up_again(result):
+    cache = CountingCache(result, ttl=0, failure_ttl=0)
+
+    async def scenario():
+        await cache.resolve(PROXY)
+        await cache.resolve(PROXY)
+
+    asyncio.run(scenario())
+    assert cache.lookups == 2
+    assert len(cache._entries) == 1
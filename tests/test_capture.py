@@ -0,0 +1,109 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.models import CaptureConfig
+from app.services.capture import NetworkCapture
+
+
+class FakeResponse:
+    def __init__(self, url, content_type="application/json", body=b'{"ok": true}', status=200):
+        self.url = url
+        self.headers = {"content-type": content_type} if content_type else {}
+        self.status = status
+        self._body = body
+
+    async def body(self):
+        if isinstance(self._body, Exception):
+            raise self._body
+        return self._body
+
+
+def _capture(responses, **config):
+    capture = NetworkCapture(CaptureConfig(**config))
+
+    async def scenario():
+        for response in responses:
+            capture._on_response(response)
+        return await capture.drain()
+
+    return capture, asyncio.run(scenario())
+
+
+def test_matches_url_pattern_and_content_type():
+    _, captured = _capture(
+        [
+            FakeResponse("https://shop.test/api/products?page=1"),
+            FakeResponse("https://shop.test/static/app.js", "text/javascript"),
+            FakeResponse("https://shop.test/api/ping", "text/plain", b"pong"),
+            FakeResponse("https://shop.test/api/empty", None),
+        ],
+        url_patterns=["*/api/*"],
+    )
+
+    assert [c.url for c in captured] == ["https://shop.test/api/products?page=1"]
+    assert captured[0].data == {"ok": True}
+    assert captured[0].body is None
+    assert captured[0].pattern == "*/api/*"
+
+
+def test_non_json_and_unreadable_bodies():
+    _, captured = _capture(
+        [
+            FakeResponse("https://shop.test/feed.xml", "text/xml", b"<rss/>"),
+            FakeResponse("https://shop.test/bad.json", "application/json", b"{not json"),
+            FakeResponse("https://shop.test/gone.json", body=RuntimeError("redirect")),
+        ],
+        url_patterns=["*.xml", "*.json"],
+        content_types=["text/xml", "application/json"],
+    )
+
+    assert [(c.url, c.body, c.data) for c in captured] == [
+        ("https://shop.test/feed.xml", "<rss/>", None),
+        ("https://shop.test/bad.json", "{not json", None),
+    ]
+
+
+def test_max_responses_counts_pending_reads():
+    _, captured = _capture(
+        [FakeResponse(f"https://shop.test/api/{i}") for i in range(5)],
+        url_patterns=["*/api/*"],
+        max_responses=2,
+    )
+
+    assert len(captured) == 2
+
+
+def test_wait_reports_whether_every_pattern_matched():
+    config = {"url_patterns": ["*/api/products*", "*/api/prices*"]}
+
+    async def scenario(urls):
+        capture = NetworkCapture(CaptureConfig(**config))
+        for url in urls:
+            capture._on_response(FakeResponse(url))
+        return await capture.wait(200), capture.complete
+
+    both = asyncio.run(
+        scenario(["https://shop.test/api/products", "https://shop.test/api/prices"])
+    )
+    one = asyncio.run(scenario(["https://shop.test/api/products"]))
+
+    assert both == (True, True)
+    assert one == (False, False)
+
+
+def test_capture_with_http_scraper_is_rejected():
+    from app.main import app
+
+    response = TestClient(app).post(
+        "/scrape",
+        json={
+            "url": "https://shop.test/",
+            "scraper_type": "http",
+            "capture": {"url_patterns": ["*/api/*"]},
+        },
+        headers={"Authorization": "Bearer test"},
+    )
+
+    assert response.status_code == 400
+    assert "capture" in response.json()["detail"]
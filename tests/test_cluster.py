@@ -0,0 +1,105 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException, Request
+
+from app.cluster import Cluster, HashRing
+from app.domains import registrable_domain
+
+NODES = [f"http://10.0.0.{i}:8000" for i in range(1, 5)]
+DOMAINS = [f"site{i}.example" for i in range(2000)]
+
+
+@pytest.mark.parametrize(
+    "host, expected",
+    [
+        ("example.com", "example.com"),
+        ("www.example.com", "example.com"),
+        ("a.b.example.com", "example.com"),
+        ("shop.example.co.uk", "example.co.uk"),
+        ("store.com.au", "store.com.au"),
+        ("WWW.Example.COM.", "example.com"),
+        ("203.0.113.7", "203.0.113.7"),
+        ("localhost", "localhost"),
+    ],
+)
+def test_registrable_domain(host, expected):
+    assert registrable_domain(host) == expected
+
+
+def test_ring_spreads_domains_evenly():
+    ring = HashRing(NODES, 128)
+    counts = {node: 0 for node in NODES}
+    for domain in DOMAINS:
+        counts[ring.owner(domain)] += 1
+
+    assert all(0.15 < count / len(DOMAINS) < 0.35 for count in counts.values())
+    assert sum(ring.shares().values()) == pytest.approx(1.0, abs=1e-3)
+
+
+def test_removing_a_node_only_moves_its_domains():
+    before = HashRing(NODES, 128)
+    after = HashRing(NODES[:-1], 128)
+
+    moved = [d for d in DOMAINS if before.owner(d) != after.owner(d)]
+    assert moved
+    assert all(before.owner(d) == NODES[-1] for d in moved)
+
+
+def test_empty_ring_has_no_owner():
+    ring = HashRing([], 128)
+    assert ring.owner("example.com") is None
+    assert ring.shares() == {}
+
+
+def _request():
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/scrape",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")],
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"{}", "more_body": False}
+
+    return Request(scope, receive)
+
+
+def _route_with(error):
+    cluster = Cluster(NODES[0], NODES[:2], 128)
+    url = next(
+        f"https://{d}/" for d in DOMAINS if cluster.owner_for(f"https://{d}/") == NODES[1]
+    )
+
+    def handler(request):
+        raise error
+
+    async def scenario():
+        cluster._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await cluster.route(_request(), url)
+        finally:
+            await cluster._client.aclose()
+
+    return cluster, asyncio.run(scenario())
+
+
+def test_unreachable_owner_falls_back_locally():
+    cluster, routed = _route_with(httpx.ConnectError("refused"))
+
+    assert routed is None
+    assert cluster.healthy == {NODES[0]}
+
+
+@pytest.mark.parametrize(
+    "error, status",
+    [(httpx.ReadTimeout("slow"), 504), (httpx.RemoteProtocolError("reset"), 502)],
+)
+def test_owner_failing_mid_request_is_not_retried_locally(error, status):
+    with pytest.raises(HTTPException) as excinfo:
+        _route_with(error)
+
+    assert excinfo.value.status_code == status
@@ -0,0 +1,103 @@
+import asyncio
+import zlib
+
+import pytest
+
+from app.compression import ENCODERS, CompressionMiddleware, negotiate_encoding
+
+LINES = [b'{"type": "page", "url": "https://example.com/%d"}\n' % i for i in range(5)]
+
+
+def _decompressor(encoding):
+    if encoding == "gzip":
+        return zlib.decompressobj(31).decompress
+    if encoding == "br":
+        import brotli
+
+        return brotli.Decompressor().process
+    import zstandard
+
+    return zstandard.ZstdDecompressor().decompressobj().decompress
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip", "gzip"),
+        ("gzip, deflate", "gzip"),
+        ("GZIP;q=0.5", "gzip"),
+        ("gzip;q=0", None),
+        ("identity", None),
+        ("", None),
+        ("*;q=0", None),
+        ("*", next(iter(ENCODERS))),
+    ],
+)
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_negotiate_encoding_prefers_higher_q_then_server_order():
+    available = list(ENCODERS)
+    assert negotiate_encoding(", ".join(available)) == available[0]
+    if len(available) > 1:
+        header = f"{available[0]};q=0.4, {available[-1]};q=0.9"
+        assert negotiate_encoding(header) == available[-1]
+
+
+def _run(app, encoding):
+    middleware = CompressionMiddleware(app, minimum_size=1024)
+    scope = {
+        "type": "http",
+        "headers": [(b"accept-encoding", encoding.encode())],
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return sent
+
+
+@pytest.mark.parametrize("encoding", list(ENCODERS))
+def test_streamed_chunks_are_flushed_as_they_arrive(encoding):
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/x-ndjson")],
+            }
+        )
+        for line in LINES:
+            await send({"type": "http.response.body", "body": line, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    start, *bodies = _run(app, encoding)
+    assert (b"content-encoding", encoding.encode()) in start["headers"]
+
+    decompress = _decompressor(encoding)
+    # Each line must be decodable from the bytes sent with it, not only at the end
+    for line, message in zip(LINES, bodies):
+        assert decompress(message["body"]) == line
+    assert decompress(bodies[-1]["body"]) == b""
+
+
+def test_small_complete_body_is_not_compressed():
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send({"type": "http.response.body", "body": b'{"ok": true}'})
+
+    start, body = _run(app, "gzip")
+    assert all(name != b"content-encoding" for name, _ in start["headers"])
+    assert body["body"] == b'{"ok": true}'
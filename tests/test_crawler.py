@@ -0,0 +1,65 @@
+import asyncio
+import os
+
+import pytest
+
+from app.config import settings
+from app.models import CrawlRequest, ScrapeResponse, ScraperType
+from app.services.crawler import Crawler
+from app.services.factory import ScraperFactory
+
+PAGES = {
+    "https://example.com/": '<a href="https://www.example.com/about">About</a>'
+    '<a href="https://other.test/">Elsewhere</a>',
+    "https://www.example.com/about": "<p>About us</p>",
+}
+
+
+class FakeScraper:
+    def __init__(self):
+        self.cookies_sent = {}
+
+    async def scrape(self, url, cookies=None, **kwargs):
+        self.cookies_sent[url] = cookies
+        return ScrapeResponse(
+            success=url in PAGES,
+            html=PAGES.get(url),
+            cookies={"session": "abc"},
+            execution_time=0.01,
+            scraper_used=ScraperType.HTTP,
+            retries_attempted=0,
+        )
+
+
+@pytest.fixture
+def crawl_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CRAWL_DIR", str(tmp_path / "crawls"))
+    return tmp_path / "crawls"
+
+
+def test_frontier_is_only_opened_while_running(crawl_dir, monkeypatch):
+    scraper = FakeScraper()
+    monkeypatch.setattr(ScraperFactory, "get_scraper", lambda scraper_type: scraper)
+    crawler = Crawler(CrawlRequest(seeds=["https://example.com/"], concurrency=1))
+
+    assert not crawl_dir.exists()
+
+    async def scenario():
+        return [item async for item in crawler.run()]
+
+    items = asyncio.run(scenario())
+    assert [item.url for item in items[:-1]] == list(PAGES)
+    assert items[-1].pages_crawled == 2
+    assert os.listdir(crawl_dir) == []
+    # Cookies set on the apex domain are carried to its subdomain
+    assert scraper.cookies_sent["https://www.example.com/about"] == {"session": "abc"}
+
+
+def test_same_domain_allows_subdomains_of_seeds():
+    crawler = Crawler(CrawlRequest(seeds=["https://example.com/"]))
+    crawler.allowed_sites = {crawler._site("https://example.com/")}
+
+    assert crawler._allowed("https://www.example.com/about")
+    assert crawler._allowed("https://blog.example.com/")
+    assert not crawler._allowed("https://example.org/")
+    assert not crawler._allowed("https://notexample.com/")
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from app.models import ScrapeResponse, ScraperType
+from app.services.fingerprint import apply_change_detection, compute_fingerprint, validate_selector
+
+PAGE = '<html><body><main><div class="price">$10</div></main></body></html>'
+
+
+def _result(html):
+    return ScrapeResponse(
+        success=True,
+        html=html,
+        execution_time=0.1,
+        scraper_used=ScraperType.HTTP,
+        retries_attempted=0,
+    )
+
+
+def test_region_fingerprint_ignores_rest_of_page():
+    fingerprint, normalized = compute_fingerprint(PAGE, "main .price")
+    other, _ = compute_fingerprint(PAGE.replace("<main>", "<h1>New</h1><main>"), "main .price")
+
+    assert normalized == '<div class="price">$10</div>'
+    assert fingerprint == other
+
+
+def test_selector_matching_nothing_has_no_fingerprint():
+    empty_fingerprint, _ = compute_fingerprint("<html><body></body></html>", ".price")
+
+    async def scenario():
+        return await apply_change_detection(
+            _result(PAGE), selector=".missing", if_none_match=empty_fingerprint
+        )
+
+    result = asyncio.run(scenario())
+    assert empty_fingerprint is None
+    assert result.fingerprint is None
+    assert result.unchanged is None
+    assert result.html == PAGE
+
+
+@pytest.mark.parametrize("selector", ["", "main > .price", "a:hover"])
+def test_unsupported_selector_is_rejected(selector):
+    with pytest.raises(ValueError):
+        validate_selector(selector)
@@ -0,0 +1,96 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.http_scraper import HttpScraper
+
+PAGE = "<html><body>" + "<p>Plenty of visible text on this page.</p>" * 20 + "</body></html>"
+
+
+def _handler(request):
+    if request.url.path == "/login":
+        return httpx.Response(
+            302,
+            headers={"Location": "/home", "Set-Cookie": "session=abc; Path=/"},
+        )
+    return httpx.Response(
+        200,
+        headers={"Set-Cookie": "seen=1; Path=/"},
+        text=PAGE,
+    )
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    scraper = HttpScraper()
+    create_client = scraper._create_client
+    sent = []
+
+    def handler(request):
+        sent.append((request.url.path, request.headers.get("cookie")))
+        return _handler(request)
+
+    def create_mocked_client(proxy=None):
+        client = create_client(proxy)
+        client._transport = httpx.MockTransport(handler)
+        client._mounts = {}
+        return client
+
+    monkeypatch.setattr(scraper, "_create_client", create_mocked_client)
+    scraper.sent = sent
+    return scraper
+
+
+def test_cookies_from_redirect_chain_are_returned(scraper):
+    result = asyncio.run(scraper.scrape("https://shop.test/login", cookies={"pref": "x"}))
+
+    assert result.success
+    assert result.cookies == {"pref": "x", "session": "abc", "seen": "1"}
+    # The cookie set by the redirect is sent on the next hop
+    assert scraper.sent == [("/login", "pref=x"), ("/home", "pref=x; session=abc")]
+
+
+def test_cookies_are_not_shared_between_callers(scraper):
+    async def scenario():
+        await scraper.scrape("https://shop.test/login", cookies={"pref": "x"})
+        scraper.sent.clear()
+        return await scraper.scrape("https://shop.test/home")
+
+    result = asyncio.run(scenario())
+
+    assert scraper.sent == [("/home", None)]
+    assert result.cookies == {"seen": "1"}
+
+
+def test_proxy_clients_are_evicted_and_closed(scraper, monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_MAX_PROXY_CLIENTS", 2)
+
+    async def scenario():
+        for port in (8001, 8002, 8003):
+            await scraper.scrape(
+                "https://shop.test/home", proxy_url=f"http://proxy.test:{port}"
+            )
+            if port == 8001:
+                first = scraper._clients["http://proxy.test:8001"]
+        return first
+
+    first = asyncio.run(scenario())
+
+    assert list(scraper._clients) == ["http://proxy.test:8002", "http://proxy.test:8003"]
+    assert first.is_closed
+
+
+@pytest.mark.parametrize(
+    "selector, success",
+    [("body p", True), ("#app .product", False), ("div > p", False)],
+)
+def test_selector_must_be_in_static_html(scraper, selector, success):
+    result = asyncio.run(
+        scraper.scrape("https://shop.test/home", selector_to_wait_for=selector)
+    )
+
+    assert result.success is success
+    if not success:
+        assert result.error.startswith(f"Blocked: selector '{selector}'")
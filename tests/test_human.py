@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from app.services.human import PROFILES, HumanBehavior, plan_trajectory
+
+VIEWPORT = {"width": 1280, "height": 720}
+
+
+class FakeMouse:
+    def __init__(self):
+        self.calls = []
+
+    async def move(self, x, y, steps=1):
+        self.calls.append(("move", steps))
+
+    async def wheel(self, dx, dy):
+        self.calls.append(("wheel", dy))
+
+
+class FakePage:
+    def __init__(self):
+        self.mouse = FakeMouse()
+
+
+@pytest.mark.parametrize("name", list(PROFILES))
+def test_trajectory_stays_within_knot_cap_and_viewport(name):
+    profile = PROFILES[name]
+    rng = np.random.default_rng(7)
+    for _ in range(50):
+        trajectory = plan_trajectory(VIEWPORT, profile, rng=rng)
+
+        assert 1 <= len(trajectory.points) <= profile.max_knots
+        assert len(trajectory.delays_ms) == len(trajectory.points)
+        assert (trajectory.points >= 0).all()
+        assert (trajectory.points[:, 0] < VIEWPORT["width"]).all()
+        assert (trajectory.points[:, 1] < VIEWPORT["height"]).all()
+        assert (trajectory.delays_ms >= 0).all()
+
+
+def test_scale_to_fits_budget_and_keeps_proportions():
+    trajectory = plan_trajectory(VIEWPORT, PROFILES["cautious"], rng=np.random.default_rng(1))
+    before = trajectory.delays_ms.copy()
+    assert trajectory.duration_ms > 500
+
+    trajectory.scale_to(500)
+
+    assert trajectory.duration_ms == pytest.approx(500)
+    assert np.allclose(trajectory.delays_ms / before, trajectory.delays_ms[0] / before[0])
+
+
+def test_scale_to_leaves_short_runs_alone():
+    trajectory = plan_trajectory(VIEWPORT, PROFILES["fast"], rng=np.random.default_rng(2))
+    duration = trajectory.duration_ms
+
+    trajectory.scale_to(duration * 10)
+
+    assert trajectory.duration_ms == duration
+
+
+def test_scale_to_zero_budget_removes_all_pauses():
+    trajectory = plan_trajectory(VIEWPORT, PROFILES["natural"], rng=np.random.default_rng(3))
+
+    trajectory.scale_to(0)
+
+    assert trajectory.duration_ms == 0
+
+
+def test_zero_budget_run_sends_nothing():
+    page = FakePage()
+
+    asyncio.run(HumanBehavior("natural", budget_ms=0).run(page, VIEWPORT))
+
+    assert page.mouse.calls == []
+
+
+def test_run_dispatches_one_message_per_knot_within_budget():
+    page = FakePage()
+    start = time.monotonic()
+
+    asyncio.run(HumanBehavior("cautious", budget_ms=200).run(page, VIEWPORT))
+
+    assert time.monotonic() - start < 0.5
+    moves = [call for call in page.mouse.calls if call[0] == "move"]
+    assert 1 <= len(moves) <= PROFILES["cautious"].max_knots
+    assert all(steps == 1 for _, steps in moves)
@@ -0,0 +1,157 @@
+import asyncio
+import os
+
+import pytest
+
+from app.services.resource_cache import (
+    DomainBlocklist,
+    ResourceCache,
+    ResourceRouter,
+    freshness_lifetime,
+)
+
+ASSET_URL = "https://cdn.example.com/app.js"
+CACHEABLE_HEADERS = {"cache-control": "max-age=3600", "content-type": "text/javascript"}
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type="script", method="GET"):
+        self.url = url
+        self.resource_type = resource_type
+        self.method = method
+
+
+class FakeRoute:
+    def __init__(self, request):
+        self.request = request
+        self.actions = []
+
+    async def abort(self, error_code=None):
+        self.actions.append("abort")
+
+    async def continue_(self):
+        self.actions.append("continue")
+
+    async def fulfill(self, status, headers, body):
+        self.actions.append(("fulfill", status, body))
+
+    async def fetch(self):
+        raise AssertionError("misses must not be fetched outside the browser")
+
+
+class FakeResponse:
+    def __init__(self, url, headers, body=b"console.log(1)", status=200):
+        self.url = url
+        self.request = FakeRequest(url)
+        self.headers = headers
+        self.status = status
+        self._body = body
+        self.body_reads = 0
+
+    async def body(self):
+        self.body_reads += 1
+        return self._body
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResourceCache(str(tmp_path / "resources"), 10 * 1024 * 1024)
+
+
+def test_miss_continues_in_browser_and_response_fills_cache(cache):
+    router = ResourceRouter(cache, DomainBlocklist([]))
+
+    async def scenario():
+        first = FakeRoute(FakeRequest(ASSET_URL))
+        await router.handle(first)
+        await router._store_response(FakeResponse(ASSET_URL, CACHEABLE_HEADERS))
+
+        second = FakeRoute(FakeRequest(ASSET_URL))
+        await router.handle(second)
+        return first.actions, second.actions
+
+    first, second = asyncio.run(scenario())
+    assert first == ["continue"]
+    assert second == [("fulfill", 200, b"console.log(1)")]
+
+
+def test_uncacheable_response_body_is_not_read(cache):
+    router = ResourceRouter(cache, DomainBlocklist([]))
+    response = FakeResponse(ASSET_URL, {"cache-control": "no-store"})
+
+    asyncio.run(router._store_response(response))
+
+    assert response.body_reads == 0
+    assert not cache.is_fresh(ASSET_URL)
+
+
+def test_blocklisted_domain_is_aborted(cache):
+    router = ResourceRouter(cache, DomainBlocklist(["tracker.test"]))
+    route = FakeRoute(FakeRequest("https://px.tracker.test/collect", "xhr"))
+
+    asyncio.run(router.handle(route))
+
+    assert route.actions == ["abort"]
+
+
+def test_blocklist_url_patterns_cover_subdomains():
+    assert DomainBlocklist(["Tracker.test"]).url_patterns() == [
+        "*://tracker.test/*",
+        "*://*.tracker.test/*",
+    ]
+
+
+def test_load_sweeps_blobs_missing_from_index(cache):
+    async def scenario():
+        await cache.load()
+        await cache.put(ASSET_URL, 200, CACHEABLE_HEADERS, b"kept")
+        await cache.save()
+        # Written after the last index save, as before an unclean shutdown
+        cache._write_blob("ab" + "0" * 62, b"orphan")
+
+        reloaded = ResourceCache(cache.directory, cache.max_bytes)
+        await reloaded.load()
+        return reloaded
+
+    reloaded = asyncio.run(scenario())
+    blobs = [name for _, _, names in os.walk(cache.directory) for name in names]
+    assert "ab" + "0" * 62 not in blobs
+    assert reloaded.is_fresh(ASSET_URL)
+
+
+@pytest.mark.parametrize(
+    "extra_headers",
+    [
+        {"vary": "Origin"},
+        {"vary": "Accept-Encoding, Origin"},
+        {"access-control-allow-origin": "https://shop.example.com"},
+    ],
+)
+def test_origin_specific_responses_are_not_shared(cache, extra_headers):
+    stored = asyncio.run(
+        cache.put(ASSET_URL, 200, {**CACHEABLE_HEADERS, **extra_headers}, b"x")
+    )
+
+    assert not stored
+    assert not cache.is_fresh(ASSET_URL)
+
+
+def test_wildcard_cors_response_is_shared(cache):
+    headers = {**CACHEABLE_HEADERS, "access-control-allow-origin": "*", "vary": "Accept-Encoding"}
+
+    assert asyncio.run(cache.put(ASSET_URL, 200, headers, b"x"))
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({"cache-control": "max-age=3600"}, 3600),
+        ({"cache-control": "max-age=3600", "age": "3500"}, 100),
+        ({"cache-control": "public, s-maxage=600, max-age=60", "age": "100"}, 500),
+        ({"cache-control": "max-age=3600", "age": "3600"}, None),
+        ({"cache-control": "max-age=3600", "age": "bogus"}, 3600),
+        ({"cache-control": "no-store, max-age=3600"}, None),
+    ],
+)
+def test_freshness_lifetime_subtracts_age(headers, expected):
+    assert freshness_lifetime(headers) == expected
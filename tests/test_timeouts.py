@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import pytest
+
+from app.config import settings
+from app.services.timeouts import LatencyTracker
+
+URL = "https://slow.example.com/page"
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    return LatencyTracker(str(tmp_path / "latency.json"))
+
+
+def _fail_at_limit(tracker, kind="navigation:networkidle", selector=None):
+    """Resolve a timeout, then time out at exactly that limit"""
+    timeout = tracker.resolve(None, URL, "camoufox", kind, selector)
+    tracker.record_timeout(URL, "camoufox", kind, timeout, selector)
+    return timeout
+
+
+def test_measure_records_failures_at_the_limit_as_timeouts(tracker):
+    with pytest.raises(TimeoutError):
+        with tracker.measure(URL, "camoufox", "selector", 5, "h1"):
+            time.sleep(0.01)
+            raise TimeoutError
+    with pytest.raises(ValueError):
+        with tracker.measure(URL, "camoufox", "selector", 60000, "h1"):
+            raise ValueError
+
+    [entry] = tracker.snapshot()
+    assert entry["timeouts"] == 1
+    assert entry["samples"] == 0
+
+
+def test_wait_that_never_succeeds_does_not_ratchet_timeout(tracker):
+    timeouts = [_fail_at_limit(tracker) for _ in range(50)]
+
+    assert set(timeouts) == {settings.DEFAULT_TIMEOUT}
+
+
+def test_missing_selector_keeps_default_timeout(tracker):
+    for _ in range(50):
+        timeout = _fail_at_limit(tracker, kind="selector", selector="#never-there")
+
+    assert timeout == settings.DEFAULT_TIMEOUT
+
+
+def test_slow_site_relearns_after_repeated_timeouts(tracker):
+    kind = "navigation:networkidle"
+    for _ in range(20):
+        tracker.record(URL, "camoufox", kind, 4000)
+    assert tracker.resolve(None, URL, "camoufox", kind) == 6000
+
+    # The site slows down past the learned limit
+    for _ in range(200):
+        _fail_at_limit(tracker, kind=kind)
+        assert tracker.resolve(None, URL, "camoufox", kind) in (6000, settings.DEFAULT_TIMEOUT)
+    assert tracker.resolve(None, URL, "camoufox", kind) == settings.DEFAULT_TIMEOUT
+
+    # Under the default limit the slower waits succeed and are learned
+    for _ in range(settings.ADAPTIVE_TIMEOUT_MIN_SAMPLES):
+        tracker.record(URL, "camoufox", kind, 12000)
+    assert tracker.resolve(None, URL, "camoufox", kind) == 18000
+
+
+def test_occasional_timeouts_keep_learned_value(tracker):
+    kind = "navigation:networkidle"
+    for _ in range(20):
+        tracker.record(URL, "camoufox", kind, 4000)
+
+    for _ in range(10):
+        _fail_at_limit(tracker, kind=kind)
+        for _ in range(19):
+            tracker.record(URL, "camoufox", kind, 4000)
+
+    assert tracker.resolve(None, URL, "camoufox", kind) == 6000
+
+
+def test_learns_from_successes_and_pinned_timeout_wins(tracker):
+    kind = "selector"
+    for latency in range(1000, 1000 + settings.ADAPTIVE_TIMEOUT_MIN_SAMPLES * 100, 100):
+        tracker.record(URL, "camoufox", kind, latency, "h1")
+
+    assert tracker.resolve(None, URL, "camoufox", kind, "h1") == settings.ADAPTIVE_TIMEOUT_MIN_MS
+    assert tracker.resolve(7000, URL, "camoufox", kind, "h1") == 7000
+
+
+def test_timeouts_survive_save_and_load(tracker):
+    for _ in range(3):
+        _fail_at_limit(tracker)
+    asyncio.run(tracker.save())
+
+    restored = LatencyTracker(tracker.state_file)
+    asyncio.run(restored.load())
+
+    [entry] = restored.snapshot("slow.example.com")
+    assert entry["timeouts"] == 3
+    assert entry["samples"] == 0